@@ -0,0 +1,114 @@
+import streamlit as st
+import pandas as pd
+import functools
+import os
+
+from utils import jobs
+from utils.cohort_cube import FEATURES
+from utils.serving import get_router
+
+st.set_page_config(page_title="Batch Scoring", layout="wide", page_icon="📦")
+
+# Pick up jobs queued before a restart
+jobs.ensure_worker()
+
+st.header("Batch Scoring")
+st.markdown("""
+Upload a CSV of patient records to score them all at once. Scoring runs as a **background job**:
+you can leave or reload this page and come back for the results later.
+""")
+
+# ------------------ Upload ------------------ #
+st.subheader("📤 New Scoring Job")
+st.markdown(
+    f"The file needs these columns: `{'`, `'.join(FEATURES)}`. Any other columns are kept in the output. "
+    "As on the prediction page, records with a zero Glucose, Blood Pressure, BMI or Age are not scored."
+)
+
+router = get_router()
+# The compiled Random Forest is tuned for single requests and slower than scikit-learn in bulk
+models = list(dict.fromkeys([router.primary.name, "SVM"]))
+
+uploaded = st.file_uploader("Patient records (CSV)", type=["csv"])
+model_name = st.selectbox("Model", models, help="The primary model serves the Diabetes Prediction page.")
+
+if st.button("🚀 Start Scoring", disabled=uploaded is None):
+    header = pd.read_csv(uploaded, nrows=0).columns
+    missing = [col for col in FEATURES if col not in header]
+    if missing:
+        st.error(f"The file is missing these columns: {', '.join(missing)}")
+    else:
+        input_path = jobs.save_input(uploaded.getvalue())
+        jobs.submit("score_batch", {"input_path": input_path, "model": model_name, "filename": uploaded.name})
+        st.success("Job queued. Progress is shown below.")
+
+
+# ------------------ Jobs ------------------ #
+def read_output(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+status_icons = {
+    jobs.QUEUED: "⏳", jobs.RUNNING: "⚙️", jobs.SUCCEEDED: "✅", jobs.FAILED: "❌", jobs.CANCELLED: "🚫",
+}
+
+
+@st.fragment(run_every=2)
+def show_jobs():
+    job_list = jobs.list_jobs("score_batch", limit=20)
+    if job_list.empty:
+        st.info("No scoring jobs yet.")
+        return
+
+    for row in job_list.itertuples():
+        job = jobs.get_job(row.id)
+        with st.container(border=True):
+            col1, col2 = st.columns([4, 1])
+            created = pd.to_datetime(job["created_at"], unit="s").strftime("%Y-%m-%d %H:%M:%S")
+            col1.markdown(
+                f"{status_icons[job['status']]} **{job['params'].get('filename', 'upload')}** • "
+                f"`{job['params'].get('model', router.primary.name)}` • {created} UTC"
+            )
+            if job["status"] in (jobs.QUEUED, jobs.RUNNING):
+                col1.progress(job["progress"], text=job["message"])
+                if col2.button("Cancel", key=f"cancel_{job['id']}", disabled=bool(job["cancel_requested"])):
+                    jobs.cancel(job["id"])
+                    st.rerun(scope="fragment")
+            elif job["status"] == jobs.SUCCEEDED:
+                result = jobs.load_result(job)
+                if result and os.path.exists(result["output_path"]):
+                    scored = result.get("scored", result["rows"])
+                    col1.caption(
+                        f"{scored:,} records scored with {result['model_version']} • "
+                        f"{result['predicted_diabetic'] / max(scored, 1):.1%} predicted diabetic"
+                    )
+                    if result.get("rejected"):
+                        col1.warning(
+                            f"{result['rejected']:,} records were not scored: Glucose, Blood Pressure, BMI and Age "
+                            "cannot be zero, and no feature may be missing. See the `Rejected` column in the download."
+                        )
+                    # The file is only read when the button is clicked, not on every refresh
+                    col2.download_button(
+                        "⬇️ Download", functools.partial(read_output, result["output_path"]),
+                        file_name=f"scored_{job['params'].get('filename', 'records.csv')}",
+                        mime="text/csv", key=f"download_{job['id']}",
+                    )
+                else:
+                    col1.caption("Results have expired.")
+            else:
+                col1.caption(job["message"])
+
+
+st.subheader("📋 Recent Jobs")
+show_jobs()
+
+st.markdown("---")
+st.info(f"Finished jobs and their results are kept for {jobs.result_ttl() / 86400:g} days.")
+
+# Footer
+st.markdown("---")
+st.markdown(
+    "<center><small>Built with ❤️ using Streamlit & Python @ 2025 Ashan Sandeepa</small></center>",
+    unsafe_allow_html=True
+)
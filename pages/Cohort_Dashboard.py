@@ -0,0 +1,97 @@
+import streamlit as st
+import plotly.express as px
+
+from utils.cohort_cube import FEATURES, load_cube
+
+st.set_page_config(page_title="Cohort Dashboard", layout="wide", page_icon="🧩")
+
+# Built once per process from diabetes_binned.csv and shared by every session
+cube = load_cube()
+
+st.header("Cohort Dashboard")
+st.markdown("""
+Compare patient cohorts defined by **age group**, **BMI group** and **diabetes outcome**.
+Statistics come from a precomputed cohort cube over the cleaned, binned dataset, so every selection updates instantly.
+""")
+
+# ------------------ Sidebar ------------------ #
+with st.sidebar:
+    st.header("🧩 Cohort Filters")
+    age_groups = st.multiselect("🎂 Age Groups", cube.age_labels, default=cube.age_labels)
+    bmi_groups = st.multiselect("⚖️ BMI Groups", cube.bmi_labels, default=cube.bmi_labels)
+    outcomes = st.multiselect(
+        "🧬 Diabetes Outcome",
+        options=[0, 1],
+        default=[0, 1],
+        format_func=lambda x: "Positive (1)" if x == 1 else "Negative (0)"
+    )
+    feature = st.selectbox("📐 Feature", FEATURES, index=FEATURES.index("Glucose"))
+    group_by = st.multiselect("🗂️ Group Table By", ["AgeGroup", "BMIGroup", "Outcome"], default=["AgeGroup"])
+
+cohort = cube.select(age_groups, bmi_groups, outcomes)
+
+if cohort.count == 0:
+    st.warning("No patients match the selected cohort. Adjust the filters in the sidebar.")
+else:
+    # ------------------ Summary ------------------ #
+    summary = cohort.feature_summary(feature)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Patients", cohort.count)
+    col2.metric("Diabetes Rate", f"{cohort.diabetes_rate:.1%}")
+    col3.metric(f"Mean {feature}", f"{summary['Mean']:.2f}", help=f"Standard deviation: {summary['Std']:.2f}")
+    col4.metric(f"Median {feature}", f"{summary['Median']:.2f}", help=f"IQR: {summary['P25']:.2f} – {summary['P75']:.2f}")
+
+    # ------------------ Heatmap ------------------ #
+    with st.expander("🗺️ Diabetes Rate by Age and BMI Group", expanded=True):
+        st.markdown("Share of diabetic patients in each age/BMI cohort. Empty cells have no patients in the dataset.")
+        matrix = cube.rate_matrix().loc[age_groups, bmi_groups]
+        fig_rate = px.imshow(
+            matrix,
+            text_auto=".0%",
+            color_continuous_scale="Reds",
+            zmin=0,
+            zmax=1,
+            labels={"x": "BMI Group", "y": "Age Group", "color": "Diabetes Rate"},
+            aspect="auto",
+        )
+        st.plotly_chart(fig_rate, use_container_width=True)
+
+    # ------------------ Cohort Table ------------------ #
+    with st.expander(f"📋 {feature} Statistics by Cohort", expanded=True):
+        if group_by:
+            table = cube.table(by=group_by, feature=feature, age_groups=age_groups, bmi_groups=bmi_groups, outcomes=outcomes)
+            st.dataframe(
+                table.style.format({
+                    "Diabetes Rate": "{:.1%}",
+                    "Mean": "{:.2f}", "Std": "{:.2f}", "P25": "{:.2f}", "Median": "{:.2f}", "P75": "{:.2f}",
+                }),
+                use_container_width=True,
+            )
+
+            if len(group_by) == 1:
+                fig_mean = px.bar(
+                    table.astype({group_by[0]: str}),
+                    x=group_by[0],
+                    y="Mean",
+                    error_y="Std",
+                    color="Diabetes Rate",
+                    color_continuous_scale="Reds",
+                    title=f"Mean {feature} by {group_by[0]}",
+                )
+                st.plotly_chart(fig_mean, use_container_width=True)
+        else:
+            st.info("Choose at least one dimension to group the table by.")
+
+st.markdown("---")
+st.markdown("""
+**Notes**
+- Cohorts are built from `diabetes_binned.csv`, the dataset after zero replacement and IQR outlier removal.
+- Means and standard deviations are exact; medians and quartiles come from quantile sketches and are exact for datasets of this size.
+""")
+
+# Footer
+st.markdown("---")
+st.markdown(
+    "<center><small>Built with ❤️ using Streamlit & Python @ 2025 Ashan Sandeepa</small></center>",
+    unsafe_allow_html=True
+)
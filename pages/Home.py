@@ -56,8 +56,11 @@ You can explore different sections from the **left sidebar**:
 - **Home** — You're here! Learn about the app and its features.
 - **Data Exploration** — View and filter patient data.
 - **Data Visualization** — Visualize important health indicators.
+- **Cohort Dashboard** — Compare diabetes rates and health metrics across age and BMI groups.
 - **Diabetes Prediction** — Enter your health stats and get a prediction.
 - **Model Performance** — See how our ML models perform and compare.
+- **Batch Scoring** — Upload a CSV of patient records and score them in the background.
+- **Prediction Monitoring** — Review the audit log of predictions made in the app.
 """)
 
 with st.expander("📘 Click to View Step-by-Step Guide", expanded=False):
@@ -1,26 +1,39 @@
 import streamlit as st
-import pandas as pd
 import os
 
+from utils.artifacts import read_csv
+from utils.cache import get_cache, make_key
+
 st.set_page_config(page_title="Model Data Exploration", layout="wide", page_icon="🔎")
-df = pd.read_csv(os.path.join("data", "diabetes.csv"))
+data_path = os.path.join("data", "diabetes.csv")
+df = read_csv(data_path)
 
-# Ensure correct data types
-for col in df.select_dtypes(include="Int64").columns:
-    df[col] = df[col].astype("int64")
+# Ensure correct data types (astype returns a copy, so the shared frame is untouched)
+nullable_int_cols = df.select_dtypes(include="Int64").columns
+if len(nullable_int_cols):
+    df = df.astype({col: "int64" for col in nullable_int_cols})
 
 # ------------------ Defaults for Filters ------------------ #
-defaults = {
-    "age_range": (int(df["Age"].min()), int(df["Age"].max())),
-    "preg_range": (int(df["Pregnancies"].min()), int(df["Pregnancies"].max())),
-    "glucose_range": (int(df["Glucose"].min()), int(df["Glucose"].max())),
-    "bp_range": (int(df["BloodPressure"].min()), int(df["BloodPressure"].max())),
-    "skin_range": (int(df["SkinThickness"].min()), int(df["SkinThickness"].max())),
-    "insulin_range": (int(df["Insulin"].min()), int(df["Insulin"].max())),
-    "bmi_range": (float(df["BMI"].min()), float(df["BMI"].max())),
-    "dpf_range": (float(df["DiabetesPedigreeFunction"].min()), float(df["DiabetesPedigreeFunction"].max())),
-    "outcome_filter": list(df["Outcome"].unique())
-}
+# Computed once per process and shared by every session; sessions only keep
+# small handles (filter ranges, sample row labels) into the shared frame.
+def filter_defaults(data):
+    return {
+        "age_range": (int(data["Age"].min()), int(data["Age"].max())),
+        "preg_range": (int(data["Pregnancies"].min()), int(data["Pregnancies"].max())),
+        "glucose_range": (int(data["Glucose"].min()), int(data["Glucose"].max())),
+        "bp_range": (int(data["BloodPressure"].min()), int(data["BloodPressure"].max())),
+        "skin_range": (int(data["SkinThickness"].min()), int(data["SkinThickness"].max())),
+        "insulin_range": (int(data["Insulin"].min()), int(data["Insulin"].max())),
+        "bmi_range": (float(data["BMI"].min()), float(data["BMI"].max())),
+        "dpf_range": (float(data["DiabetesPedigreeFunction"].min()), float(data["DiabetesPedigreeFunction"].max())),
+        "outcome_filter": sorted(int(x) for x in data["Outcome"].unique())
+    }
+
+defaults = get_cache().get_or_compute(
+    "datasets",
+    make_key("filter_defaults", data_path, os.path.getmtime(data_path)),
+    lambda: filter_defaults(df)
+)
 
 # ------------------ Initialize Session State ------------------ #
 for key, value in defaults.items():
@@ -51,7 +64,7 @@ with st.sidebar:
 
     st.session_state.outcome_filter = st.multiselect(
         "🧬 Diabetes Outcome",
-        options=df["Outcome"].unique(),
+        options=defaults["outcome_filter"],
         default=st.session_state.outcome_filter,
         format_func=lambda x: "Positive (1)" if x == 1 else "Negative (0)"
     )
@@ -83,11 +96,11 @@ with col2:
 
 # -------------- Sample Section --------------- #
 st.subheader("Sample Records (10 Random Rows)")
-if "sample_data" not in st.session_state:
-    st.session_state.sample_data = df.sample(10, random_state=42)
+if "sample_idx" not in st.session_state:
+    st.session_state.sample_idx = df.sample(10, random_state=42).index.tolist()
 if st.button("🔄 Shuffle Sample"):
-    st.session_state.sample_data = df.sample(10)
-st.dataframe(st.session_state.sample_data)
+    st.session_state.sample_idx = df.sample(10).index.tolist()
+st.dataframe(df.loc[st.session_state.sample_idx])
 
 # -------------- Filtered Data Section --------------- #
 st.subheader("Filtered Data View")
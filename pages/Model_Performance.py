@@ -1,14 +1,14 @@
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
-import joblib
 import pandas as pd
-import os
 import numpy as np
-from sklearn.metrics import classification_report, confusion_matrix, roc_curve, auc
+from sklearn.metrics import classification_report
 import plotly.express as px
 import plotly.graph_objects as go
 
+from utils import jobs
+from utils.bootstrap import load_bootstrap_results, results_table, test_predictions
+from utils.figures import performance_figure
+
 
 st.set_page_config(page_title="Model Performance", page_icon="📉")
 
@@ -25,6 +25,7 @@ This page presents a detailed evaluation of the diabetes prediction models we ha
 - **Confusion Matrix:** Visualizes the performance of the classification model by showing true positives, true negatives, false positives, and false negatives.
 - **Classification Report:** Detailed metrics including precision, recall, F1-score, and support for each class to understand how well the model performs.
 - **ROC Curve:** Displays the trade-off between sensitivity (true positive rate) and specificity (false positive rate) for different thresholds. The Area Under the Curve (AUC) score summarizes the overall model performance.
+- **Confidence Intervals:** Bootstrap ranges for each metric, showing how much the scores could vary on a different test sample.
 - **Model Comparison Table:** Compares multiple models on key metrics to help you identify the best-performing model.
 
 Use this information to understand the strengths and weaknesses of each model and make informed decisions for diabetes risk prediction.
@@ -40,35 +41,15 @@ st.info(
 
 st.markdown("---")
 
-# --- Load model, scaler, and columns ---
-model = joblib.load("data/best_logistic_model.pkl")
-scaler = joblib.load("data/scaler.pkl")
-columns = joblib.load("data/columns.pkl")
-
-# --- Load X_test and y_test ---
-X_test = pd.read_pickle("data/X_test.pkl")
-y_test = pd.read_pickle("data/y_test.pkl")
-
-# --- Ensure correct column order ---
-X_test = X_test[[col for col in columns if col != "Outcome"]]
-
-# --- Scale X_test ---
-X_test_scaled = scaler.transform(X_test)
-
-# --- Predict ---
-y_pred = model.predict(X_test_scaled)
-y_prob = model.predict_proba(X_test_scaled)[:, 1]
+# --- Score the test split with the saved model (shared evaluations cache) ---
+y_test, y_pred, y_prob = test_predictions()
 
 st.markdown("## Logistic Regression Model Performance")
 
 # --- Confusion Matrix ---
 st.subheader("Confusion Matrix")
-cm = confusion_matrix(y_test, y_pred)
-fig_cm, ax_cm = plt.subplots()
-sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', ax=ax_cm)
-ax_cm.set_xlabel('Predicted')
-ax_cm.set_ylabel('Actual')
-st.pyplot(fig_cm)
+# Static figures are rendered once per model version and shared by every session
+st.image(performance_figure("confusion_matrix"), use_container_width=True)
 
 # --- Classification Report ---
 st.subheader("Classification Report")
@@ -83,16 +64,76 @@ st.dataframe(report_df.style.format({
 
 # --- ROC Curve ---
 st.subheader("ROC Curve")
-fpr, tpr, _ = roc_curve(y_test, y_prob)
-roc_auc = auc(fpr, tpr)
-fig_roc, ax_roc = plt.subplots()
-ax_roc.plot(fpr, tpr, label=f"AUC = {roc_auc:.2f}")
-ax_roc.plot([0, 1], [0, 1], linestyle="--")
-ax_roc.set_xlabel("False Positive Rate")
-ax_roc.set_ylabel("True Positive Rate")
-ax_roc.set_title("ROC Curve")
-ax_roc.legend()
-st.pyplot(fig_roc)
+st.image(performance_figure("roc_curve"), use_container_width=True)
+
+# --- Bootstrap Confidence Intervals ---
+st.subheader("Confidence Intervals")
+with st.spinner("Loading bootstrap results..."):
+    # Intervals this visitor recomputed replace the default ones for their session only
+    recomputed = st.session_state.get("bootstrap_shown_job")
+    bootstrap_results = (recomputed and jobs.load_result(recomputed)) or load_bootstrap_results()
+ci_df = results_table(bootstrap_results)
+st.markdown(
+    f"The test set only has **{bootstrap_results['n_test']}** records, so single scores can be misleadingly precise. "
+    f"The intervals below come from **{bootstrap_results['n_resamples']:,}** bootstrap resamples of the test predictions "
+    f"({bootstrap_results['confidence']:.0%} confidence)."
+)
+st.dataframe(ci_df.style.format("{:.4f}"))
+
+fig_ci = go.Figure(go.Scatter(
+    x=ci_df["Estimate"],
+    y=ci_df.index,
+    mode="markers",
+    error_x=dict(
+        type="data",
+        symmetric=False,
+        array=ci_df["Upper"] - ci_df["Estimate"],
+        arrayminus=ci_df["Estimate"] - ci_df["Lower"],
+    ),
+))
+fig_ci.update_layout(
+    xaxis=dict(range=[0, 1], title="Score"),
+    yaxis=dict(title="Metric"),
+    title="Bootstrap Confidence Intervals"
+)
+st.plotly_chart(fig_ci, use_container_width=True)
+
+with st.expander("🔁 Recompute Confidence Intervals", expanded=False):
+    st.markdown(
+        "Recomputing runs as a background job, so you can keep using the app while it runs. "
+        "The new intervals are shown to you only; the defaults above stay as they are for everyone else."
+    )
+    col_resamples, col_confidence = st.columns(2)
+    n_resamples = col_resamples.number_input("Bootstrap resamples", min_value=500, max_value=100_000, value=5000, step=500)
+    confidence = col_confidence.slider("Confidence level", min_value=0.80, max_value=0.99, value=0.95, step=0.01)
+    if st.button("Start Recompute"):
+        st.session_state["bootstrap_job"] = jobs.submit(
+            "bootstrap_evaluation", {"n_resamples": int(n_resamples), "confidence": float(confidence)}
+        )
+
+    @st.fragment(run_every=2)
+    def show_bootstrap_job():
+        job_id = st.session_state.get("bootstrap_job")
+        job = job_id and jobs.get_job(job_id)
+        if not job:
+            return
+        if job["status"] in (jobs.QUEUED, jobs.RUNNING):
+            st.progress(job["progress"], text=job["message"])
+            if st.button("Cancel", disabled=bool(job["cancel_requested"])):
+                jobs.cancel(job["id"])
+        elif job["status"] == jobs.SUCCEEDED:
+            if st.session_state.get("bootstrap_shown_job") != job["id"]:
+                st.success("New confidence intervals are ready.")
+                if st.button("Show New Results"):
+                    st.session_state["bootstrap_shown_job"] = job["id"]
+                    st.rerun()
+            else:
+                finished = pd.to_datetime(job["finished_at"], unit="s").strftime("%Y-%m-%d %H:%M:%S")
+                st.caption(f"Showing your intervals recomputed {finished} UTC. Other visitors still see the default ones.")
+        else:
+            st.caption(f"Last recompute {job['status']}: {job['message']}")
+
+    show_bootstrap_job()
 
 
 # ------------------ Model Comparison Section ------------------ #
@@ -1,13 +1,27 @@
 import streamlit as st
-import joblib
 import pandas as pd
+import time
+
+from utils.artifacts import load_artifact
+from utils.audit_log import PredictionRecord, get_audit_logger
+from utils.cache import get_cache, make_key
+from utils.neighbors import load_index, similar_patients
+from utils.serving import get_router
+from utils.streaming_preprocessing import BIN_CONFIG_PATH, model_features
 
 st.set_page_config(page_title="Model Prediction", page_icon="🤖")
 
-# Load model, scaler, and expected columns
-model = joblib.load("model.pkl")
-scaler = joblib.load("data/scaler.pkl")
-columns = joblib.load("data/columns.pkl")
+# Load models, scaler, and expected columns (once per process)
+# The router picks the primary (or canary) model per request; see utils/serving.py
+router = get_router()
+router.primary.load()
+scaler = load_artifact("data/scaler.pkl")
+columns = load_artifact("data/columns.pkl")
+bin_config = load_artifact(BIN_CONFIG_PATH)
+neighbors_index = load_index()
+
+# Number of similar training records shown after a prediction
+SIMILAR_PATIENTS_K = 10
 
 st.header("Diabetes Prediction")
 st.markdown("Provide patient data to predict the likelihood of diabetes.")
@@ -129,38 +143,33 @@ if st.button("🔍 Predict"):
             st.error(err)
     else:
         with st.spinner("Predicting diabetes risk..."):
-            df = pd.DataFrame([inputs])
-
-            # Age Groups
-            age = df.at[0, "Age"]
-            age_groups = {
-                "Teen": (0, 19),
-                "Young Adult": (20, 29),
-                "Adult": (30, 39),
-                "Middle-aged": (40, 49),
-                "Senior": (50, 59),
-                "Elderly": (60, 150),
-            }
-            for group, (low, high) in age_groups.items():
-                df[f"AgeGroup_{group}"] = int(low <= age <= high)
-
-            # BMI Groups
-            bmi = df.at[0, "BMI"]
-            bmi_groups = {
-                "Underweight": (0, 18.4),
-                "Normal": (18.5, 24.9),
-                "Overweight": (25.0, 29.9),
-                "Obese": (30.0, 100),
-            }
-            for group, (low, high) in bmi_groups.items():
-                df[f"BMIGroup_{group}"] = int(low <= bmi <= high)
-
-            # Final model-ready DataFrame
-            df = df[[col for col in columns if col in df.columns]]
+            started = time.perf_counter()
+            # Age/BMI groups one-hot encoded as in training, the same way batch scoring does
+            df = model_features(pd.DataFrame([inputs]), bin_config, columns)
             df_scaled = scaler.transform(df)
 
-            prediction = model.predict(df_scaled)[0]
-            prob_positive = model.predict_proba(df_scaled)[0][1]
+            request_key = make_key(tuple(df.columns), tuple(df.iloc[0].tolist()))
+            served = router.route(request_key)
+            served_version = served.version
+
+            def score():
+                scored_at = time.perf_counter()
+                predictions, probabilities = served.score(df_scaled)
+                return int(predictions[0]), float(probabilities[0]), (time.perf_counter() - scored_at) * 1000
+
+            # Identical inputs are scored once per model and shared across sessions/replicas
+            prediction_key = make_key(served_version, request_key)
+            prediction, prob_positive, model_latency_ms = get_cache().get_or_compute("predictions", prediction_key, score)
+
+            # Audit log and shadow models: both run in the background
+            get_audit_logger().log(PredictionRecord(
+                inputs=dict(inputs),
+                prediction=prediction,
+                probability=prob_positive,
+                model_version=served_version,
+                latency_ms=(time.perf_counter() - started) * 1000,
+            ))
+            router.shadow(df_scaled, served, prediction, prob_positive, model_latency_ms)
 
             # Result Message
             if prediction == 1:
@@ -190,6 +199,7 @@ if st.button("🔍 Predict"):
 
             suggestions = []
 
+            bmi = inputs["BMI"]
             if bmi > 25:
                 suggestions.append(f"- Your **BMI ({bmi:.1f})** is in the overweight/obese range. Aim for 18.5–24.9 with regular exercise and balanced meals.")
             elif bmi < 18.5:
@@ -214,6 +224,16 @@ if st.button("🔍 Predict"):
                 for s in suggestions:
                     st.markdown(s)
 
+            # Similar Patients
+            st.markdown("---")
+            st.markdown("### 👥 Similar Patients in the Training Data")
+            similar_df = similar_patients(df_scaled, k=SIMILAR_PATIENTS_K, index=neighbors_index)
+            st.metric(
+                f"Diabetes Rate Among {len(similar_df)} Most Similar Patients",
+                f"{similar_df['Outcome'].mean():.0%}"
+            )
+            st.dataframe(similar_df.style.format({"Distance": "{:.2f}", "BMI": "{:.1f}", "DiabetesPedigreeFunction": "{:.3f}"}))
+
             # Show Input Table
             st.markdown("---")
             st.markdown("### 📋 Input Summary")
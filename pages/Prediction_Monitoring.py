@@ -0,0 +1,166 @@
+import streamlit as st
+import pandas as pd
+import time
+import json
+import plotly.express as px
+
+from utils.audit_log import count_audit_log, get_audit_logger, read_audit_log
+from utils.serving import SHADOW_TABLE, get_router
+
+st.set_page_config(page_title="Prediction Monitoring", layout="wide", page_icon="🩺")
+
+# Metrics and charts use at most this many of the newest records, so a long
+# window does not load (and re-load on every rerun) the whole log
+MAX_RECORDS = 10_000
+RECENT_RECORDS = 200
+
+st.header("Prediction Monitoring")
+st.markdown("Review the audit log of predictions made through the **Diabetes Prediction** page.")
+
+# ------------------ Sidebar ------------------ #
+windows = {
+    "Last hour": 3600,
+    "Last 24 hours": 24 * 3600,
+    "Last 7 days": 7 * 24 * 3600,
+    "All time": None,
+}
+with st.sidebar:
+    st.header("🩺 Monitoring Options")
+    window = st.selectbox("Time window", list(windows.keys()), index=1)
+    if st.button("🔄 Refresh"):
+        st.rerun()
+
+since = None if windows[window] is None else time.time() - windows[window]
+total_predictions = count_audit_log(since=since)
+log_df = read_audit_log(
+    since=since, limit=MAX_RECORDS,
+    columns=["timestamp", "prediction", "probability", "model_version", "latency_ms"],
+)
+
+logger = get_audit_logger()
+if logger.dropped:
+    st.warning(f"{logger.dropped} audit records were dropped because the log queue was full.")
+
+if log_df.empty:
+    st.info("No predictions have been logged in this time window yet.")
+else:
+    log_df = log_df.reset_index(drop=True)
+    log_df["time"] = pd.to_datetime(log_df["timestamp"], unit="s")
+
+    # ------------------ Summary ------------------ #
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Predictions", f"{total_predictions:,}")
+    col2.metric("Predicted Diabetic", f"{log_df['prediction'].mean():.1%}")
+    col3.metric("Median Latency", f"{log_df['latency_ms'].median():.1f} ms")
+    col4.metric("p95 Latency", f"{log_df['latency_ms'].quantile(0.95):.1f} ms")
+    if total_predictions > len(log_df):
+        st.caption(f"Rates, latencies and charts cover the newest {len(log_df):,} predictions in this window.")
+
+    # ------------------ Charts ------------------ #
+    with st.expander("📈 Predicted Probability Over Time", expanded=True):
+        fig_prob = px.scatter(
+            log_df,
+            x="time",
+            y="probability",
+            color=log_df["prediction"].astype(str),
+            labels={"probability": "Probability of Diabetes", "time": "Time", "color": "Prediction"},
+            title="Predicted Probability per Request",
+        )
+        fig_prob.update_layout(yaxis=dict(range=[0, 1]))
+        st.plotly_chart(fig_prob, use_container_width=True)
+
+    with st.expander("⏱️ Latency Distribution", expanded=False):
+        fig_latency = px.histogram(
+            log_df,
+            x="latency_ms",
+            color="model_version",
+            nbins=30,
+            labels={"latency_ms": "Latency (ms)", "model_version": "Model Version"},
+            title="Prediction Latency",
+        )
+        st.plotly_chart(fig_latency, use_container_width=True)
+
+    # ------------------ Recent Records ------------------ #
+    st.subheader("Recent Predictions")
+    # Only the rows shown have their inputs decoded
+    recent_df = read_audit_log(since=since, limit=RECENT_RECORDS)
+    inputs_df = pd.json_normalize(recent_df["inputs"].map(json.loads).tolist())
+    recent_df["time"] = pd.to_datetime(recent_df["timestamp"], unit="s")
+    recent_df = pd.concat(
+        [recent_df[["time", "model_version", "prediction", "probability", "latency_ms"]], inputs_df],
+        axis=1,
+    )
+    st.dataframe(recent_df, use_container_width=True)
+
+# ------------------ Shadow & Canary Models ------------------ #
+st.subheader("Shadow & Canary Models")
+router = get_router()
+st.markdown(
+    f"Primary: `{router.primary.name}` • "
+    f"Canary: `{router.canary.name if router.canary else 'none'}` ({router.canary_fraction:.0%} of traffic) • "
+    f"Shadows: {', '.join(f'`{m.name}`' for m in router.shadows) or 'none'}"
+)
+if router.scorer.skipped or router.scorer.failed:
+    st.warning(f"{router.scorer.skipped} shadow jobs were skipped (queue full) and {router.scorer.failed} failed.")
+
+total_comparisons = count_audit_log(since=since, table=SHADOW_TABLE)
+shadow_df = read_audit_log(since=since, limit=MAX_RECORDS, table=SHADOW_TABLE)
+if shadow_df.empty:
+    st.info("No shadow comparisons in this time window. Set `SHADOW_MODELS` or `CANARY_MODEL` to score other models alongside the primary.")
+else:
+    shadow_df["agree"] = shadow_df["served_prediction"] == shadow_df["shadow_prediction"]
+    shadow_df["probability_diff"] = (shadow_df["served_probability"] - shadow_df["shadow_probability"]).abs()
+    comparison = (
+        shadow_df.groupby(["served_version", "shadow_version"])
+        .agg(
+            Comparisons=("agree", "size"),
+            Agreement=("agree", "mean"),
+            MeanProbabilityDiff=("probability_diff", "mean"),
+            ServedLatency=("served_latency_ms", "median"),
+            ShadowLatency=("shadow_latency_ms", "median"),
+        )
+        .reset_index()
+        .rename(columns={
+            "served_version": "Served By",
+            "shadow_version": "Shadow Model",
+            "MeanProbabilityDiff": "Mean |Δ Probability|",
+            "ServedLatency": "Served Median Latency (ms)",
+            "ShadowLatency": "Shadow Median Latency (ms)",
+        })
+    )
+    if total_comparisons > len(shadow_df):
+        st.caption(f"Computed from the newest {len(shadow_df):,} of {total_comparisons:,} comparisons in this window.")
+    st.dataframe(
+        comparison.style.format({
+            "Agreement": "{:.1%}",
+            "Mean |Δ Probability|": "{:.3f}",
+            "Served Median Latency (ms)": "{:.2f}",
+            "Shadow Median Latency (ms)": "{:.2f}",
+        }),
+        use_container_width=True,
+    )
+
+    with st.expander("🔀 Served vs Shadow Probability", expanded=False):
+        st.markdown("Points on the diagonal are requests where both models gave the same probability.")
+        fig_shadow = px.scatter(
+            shadow_df,
+            x="served_probability",
+            y="shadow_probability",
+            color="shadow_version",
+            symbol="served_version",
+            labels={
+                "served_probability": "Served Model Probability",
+                "shadow_probability": "Shadow Model Probability",
+                "shadow_version": "Shadow Model",
+                "served_version": "Served By",
+            },
+        )
+        fig_shadow.add_shape(type="line", x0=0, y0=0, x1=1, y1=1, line=dict(dash="dash", color="gray"))
+        st.plotly_chart(fig_shadow, use_container_width=True)
+
+# Footer
+st.markdown("---")
+st.markdown(
+    "<center><small>Built with ❤️ using Streamlit & Python @ 2025 Ashan Sandeepa</small></center>",
+    unsafe_allow_html=True
+)
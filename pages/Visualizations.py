@@ -1,14 +1,15 @@
 import streamlit as st
 import seaborn as sns
 import matplotlib.pyplot as plt
-import pandas as pd
 import os
 import plotly.express as px
 
+from utils.artifacts import read_csv
+
 st.set_page_config(page_title="Visualizations", layout="wide", page_icon="📊")
 
 # Load Dataset
-df = pd.read_csv(os.path.join("data", "diabetes.csv"))
+df = read_csv(os.path.join("data", "diabetes.csv"))
 
 # Sidebar Filters
 st.sidebar.header("Visualization Filters")
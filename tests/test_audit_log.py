@@ -0,0 +1,150 @@
+import threading
+
+import pytest
+
+from utils.audit_log import AuditLogger, ParquetSink, PredictionRecord, SQLiteSink
+
+
+def _record(timestamp, prediction=0):
+    return PredictionRecord(
+        inputs={"Age": 50}, prediction=prediction, probability=0.5, model_version="model.pkl@1",
+        latency_ms=1.0, timestamp=timestamp,
+    )
+
+
+class GatedSink:
+    """Records batches; the first write blocks until ``release`` is set."""
+
+    def __init__(self):
+        self.batches = []
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def write_batch(self, records):
+        self.entered.set()
+        self.release.wait(5)
+        self.batches.append(len(records))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def gated():
+    sink = GatedSink()
+    loggers = []
+
+    def make(**kwargs):
+        logger = AuditLogger(sink, flush_interval=0.05, **kwargs)
+        loggers.append(logger)
+        return logger
+
+    yield sink, make
+    sink.release.set()
+    for logger in loggers:
+        logger.close()
+
+
+# ------------------ Logger ------------------ #
+def test_records_queued_while_writing_are_written_in_batches(gated):
+    sink, make = gated
+    logger = make(batch_size=3)
+    logger.log(_record(0))
+    assert sink.entered.wait(5)
+    for i in range(1, 7):
+        assert logger.log(_record(i))
+
+    sink.release.set()
+    logger.flush()
+    assert sink.batches == [1, 3, 3]
+    assert logger.written == 7 and logger.dropped == 0
+
+
+def test_records_are_dropped_when_the_queue_is_full(gated):
+    sink, make = gated
+    logger = make(max_queue=2)
+    logger.log(_record(0))
+    assert sink.entered.wait(5)  # the writer holds record 0; the queue is empty again
+    assert logger.log(_record(1)) and logger.log(_record(2))
+
+    assert not logger.log(_record(3))
+    assert logger.dropped == 1 and logger.pending == 2
+    sink.release.set()
+    logger.flush()
+    assert logger.written == 3
+
+
+def test_drops_from_many_threads_are_all_counted(gated):
+    sink, make = gated
+    logger = make(max_queue=1)
+    logger.log(_record(0))
+    assert sink.entered.wait(5)
+    logger.log(_record(1))
+
+    barrier = threading.Barrier(8)
+
+    def flood():
+        barrier.wait()
+        for i in range(500):
+            logger.log(_record(i))
+
+    threads = [threading.Thread(target=flood) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert logger.dropped == 8 * 500
+
+
+def test_failed_writes_are_counted_and_logged(caplog):
+    class BrokenSink(GatedSink):
+        def write_batch(self, records):
+            raise OSError("disk full")
+
+    logger = AuditLogger(BrokenSink(), flush_interval=0.05)
+    try:
+        logger.log(_record(0))
+        logger.flush()
+    finally:
+        logger.close()
+    assert logger.dropped == 1 and logger.written == 0
+    assert "disk full" in caplog.text
+
+
+# ------------------ Sinks ------------------ #
+@pytest.fixture(params=["sqlite", "parquet"])
+def sink(request, tmp_path):
+    if request.param == "sqlite":
+        sink = SQLiteSink(str(tmp_path / "audit_log.sqlite3"))
+    else:
+        pytest.importorskip("pyarrow")
+        # Two rows per file, so queries read across rotated files
+        sink = ParquetSink(str(tmp_path / "audit_log"), rows_per_file=2)
+    sink.write_batch([_record(t, prediction=t % 2) for t in (100.0, 101.0, 102.0)])
+    sink.write_batch([_record(t, prediction=t % 2) for t in (103.0, 104.0)])
+    sink.close()  # Parquet files are readable once closed
+    return sink
+
+
+def test_query_returns_newest_first_with_since_and_limit(sink):
+    assert sink.query()["timestamp"].tolist() == [104.0, 103.0, 102.0, 101.0, 100.0]
+    assert sink.query(since=102.0)["timestamp"].tolist() == [104.0, 103.0, 102.0]
+    assert sink.query(since=101.0, limit=2)["timestamp"].tolist() == [104.0, 103.0]
+
+
+def test_query_reads_only_the_requested_columns(sink):
+    df = sink.query(columns=["prediction"])
+    assert list(df.columns) == ["prediction"]
+    assert df["prediction"].tolist() == [0, 1, 0, 1, 0]
+
+
+def test_count_matches_query(sink):
+    assert sink.count() == 5
+    assert sink.count(since=103.0) == 2
+    assert sink.count(since=200.0) == 0
+
+
+def test_sqlite_query_rejects_unknown_columns(tmp_path):
+    sink = SQLiteSink(str(tmp_path / "audit_log.sqlite3"))
+    with pytest.raises(ValueError):
+        sink.query(columns=["prediction; DROP TABLE predictions"])
@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+import pytest
+
+from utils import bootstrap
+from utils.bootstrap import PROGRESS_STEPS, bootstrap_metrics
+
+
+@pytest.fixture(scope="module")
+def scores():
+    rng = np.random.default_rng(0)
+    y_prob = rng.random(200)
+    y_true = (rng.random(200) < y_prob).astype(int)
+    return y_true, (y_prob > 0.5).astype(int), y_prob
+
+
+def test_progress_reports_without_changing_results(scores):
+    fractions = []
+    with_progress = bootstrap_metrics(*scores, n_resamples=1000, n_jobs=1, progress=fractions.append)
+    without = bootstrap_metrics(*scores, n_resamples=1000, n_jobs=1)
+
+    assert len(fractions) == PROGRESS_STEPS
+    assert fractions == sorted(fractions) and fractions[-1] == 1.0
+    assert with_progress.equals(without)
+
+
+def test_progress_can_stop_the_run(scores):
+    class Stop(Exception):
+        pass
+
+    def progress(fraction):
+        if fraction >= 0.5:
+            raise Stop()
+
+    with pytest.raises(Stop):
+        bootstrap_metrics(*scores, n_resamples=1000, n_jobs=1, progress=progress)
+
+
+def test_unreadable_results_file_is_recomputed(tmp_path, monkeypatch):
+    path = tmp_path / "bootstrap_metrics.pkl"
+    path.write_bytes(b"truncated")
+    monkeypatch.setattr(bootstrap, "compute_results", lambda **kwargs: {"signature": "current"})
+
+    assert bootstrap._read_or_compute(str(path), "current") == {"signature": "current"}
+    # Rewritten in place, so the next read is a hit
+    monkeypatch.setattr(bootstrap, "compute_results", lambda **kwargs: pytest.fail("recomputed a valid file"))
+    assert bootstrap._read_or_compute(str(path), "current") == {"signature": "current"}
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
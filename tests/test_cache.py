@@ -0,0 +1,146 @@
+import threading
+import time
+
+import pytest
+
+from utils.cache import Cache, FakeRedis, MemoryBackend, NamespacePolicy, RedisBackend, SQLiteBackend, make_key
+
+NAMESPACES = {"results": NamespacePolicy(ttl=60, max_entries=3, shared=True)}
+
+
+@pytest.fixture(params=["memory", "sqlite", "fakeredis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend()
+    if request.param == "sqlite":
+        # Refresh the LRU timestamp on every hit so eviction order is exact
+        return SQLiteBackend(str(tmp_path / "cache.sqlite3"), touch_interval=0)
+    return RedisBackend(FakeRedis())
+
+
+def _value(backend, namespace, key):
+    hit = backend.get(namespace, key)
+    return None if hit is None else hit[0]
+
+
+# ------------------ Backends ------------------ #
+def test_entries_expire_after_ttl(backend):
+    backend.set("results", "short", b"1", ttl=0.05)
+    backend.set("results", "long", b"2", ttl=60)
+    assert _value(backend, "results", "short") == b"1"
+    time.sleep(0.1)
+    assert _value(backend, "results", "short") is None
+    assert _value(backend, "results", "long") == b"2"
+
+
+def test_least_recently_used_entry_is_evicted(backend):
+    for key in ("a", "b", "c"):
+        backend.set("results", key, key.encode(), max_entries=3)
+        time.sleep(0.01)
+    assert _value(backend, "results", "a") == b"a"  # "b" is now the least recently used
+    time.sleep(0.01)
+    backend.set("results", "d", b"d", max_entries=3)
+
+    assert _value(backend, "results", "b") is None
+    assert [_value(backend, "results", key) for key in ("a", "c", "d")] == [b"a", b"c", b"d"]
+
+
+def test_eviction_is_per_namespace(backend):
+    for key in ("a", "b"):
+        backend.set("results", key, b"x", max_entries=2)
+        backend.set("other", key, b"y", max_entries=2)
+    backend.set("results", "c", b"x", max_entries=2)
+    assert _value(backend, "other", "a") == b"y"
+
+
+def test_sqlite_hits_only_touch_lru_timestamp_after_interval(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), touch_interval=60)
+    backend.set("results", "a", b"1")
+    query = "SELECT last_access FROM entries WHERE key = 'a'"
+    written = backend._connect().execute(query).fetchone()[0]
+    backend.get("results", "a")
+    assert backend._connect().execute(query).fetchone()[0] == written
+
+
+def test_lock_is_exclusive_until_released(backend):
+    token = backend.acquire_lock("job", ttl=60)
+    assert token is not None
+    assert backend.acquire_lock("job", ttl=60) is None
+    backend.release_lock("job", token)
+    assert backend.acquire_lock("job", ttl=60) is not None
+
+
+def test_expired_lock_owner_cannot_release_the_new_owners_lock(backend):
+    first = backend.acquire_lock("job", ttl=0.05)
+    time.sleep(0.1)
+    second = backend.acquire_lock("job", ttl=60)
+    assert second is not None
+
+    backend.release_lock("job", first)
+    assert backend.acquire_lock("job", ttl=60) is None
+    backend.release_lock("job", second)
+    assert backend.acquire_lock("job", ttl=60) is not None
+
+
+# ------------------ Cache Front-end ------------------ #
+def _run_concurrently(n_threads, target):
+    barrier = threading.Barrier(n_threads)
+    results = [None] * n_threads
+
+    def run(i):
+        barrier.wait()
+        results[i] = target(i)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def _slow_counter():
+    calls = []
+    mutex = threading.Lock()
+
+    def compute():
+        with mutex:
+            calls.append(1)
+        time.sleep(0.2)
+        return {"answer": 42}
+
+    return calls, compute
+
+
+def test_get_or_compute_is_single_flight_across_threads():
+    cache = Cache(namespaces=NAMESPACES)
+    calls, compute = _slow_counter()
+    results = _run_concurrently(16, lambda i: cache.get_or_compute("results", "key", compute))
+    assert len(calls) == 1
+    assert all(result == {"answer": 42} for result in results)
+
+
+def test_get_or_compute_is_single_flight_across_caches_sharing_a_backend(backend):
+    # Each Cache stands in for one replica: only the backend lock is shared
+    if isinstance(backend, MemoryBackend):
+        pytest.skip("the memory backend is never shared between replicas")
+    caches = [Cache(backend, namespaces=NAMESPACES) for _ in range(4)]
+    calls, compute = _slow_counter()
+    results = _run_concurrently(8, lambda i: caches[i % 4].get_or_compute("results", "key", compute))
+    assert len(calls) == 1
+    assert all(result == {"answer": 42} for result in results)
+
+
+def test_cache_expires_and_recomputes():
+    cache = Cache(namespaces={"results": NamespacePolicy(ttl=0.05)})
+    assert cache.get_or_compute("results", "key", lambda: 1) == 1
+    assert cache.get_or_compute("results", "key", lambda: 2) == 1
+    time.sleep(0.1)
+    assert cache.get_or_compute("results", "key", lambda: 3) == 3
+
+
+def test_single_flight_locks_are_released():
+    cache = Cache(namespaces=NAMESPACES)
+    for i in range(5000):
+        cache.get_or_compute("results", make_key(i), lambda: i)
+    assert cache._flights == {}
@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.svm import SVC
+
+from utils.compiled_models import COMPILED_PATHS, SCALED_TRAIN_PATH, CompiledForest, CompiledSVC, compile_model
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture(scope="module")
+def training_data():
+    train = pd.read_csv(os.path.join(ROOT, SCALED_TRAIN_PATH))
+    return train.drop(columns="Outcome").to_numpy(), train["Outcome"].to_numpy()
+
+
+@pytest.mark.parametrize("estimator", [
+    RandomForestClassifier(n_estimators=10, random_state=0),
+    SVC(kernel="rbf", probability=True, random_state=0),
+], ids=["forest", "svc"])
+def test_compiled_model_matches_sklearn(estimator, training_data):
+    X, y = training_data
+    estimator.fit(X, y)
+    compiled = compile_model(estimator)
+    np.testing.assert_allclose(compiled.predict_proba(X), estimator.predict_proba(X), atol=1e-10)
+    np.testing.assert_array_equal(compiled.predict(X), estimator.predict(X))
+    np.testing.assert_allclose(compiled.predict_proba(X[:1]), estimator.predict_proba(X[:1]), atol=1e-10)
+
+
+def test_cli_pickles_importable_classes():
+    # Run as `python -m`, the module is __main__; its pickles must still name utils.compiled_models
+    subprocess.run([sys.executable, "-m", "utils.compiled_models"], cwd=ROOT, check=True, capture_output=True)
+    for name, cls in (("Random Forest", CompiledForest), ("SVM", CompiledSVC)):
+        path = os.path.join(ROOT, COMPILED_PATHS[name])
+        with open(path, "rb") as f:
+            assert b"__main__" not in f.read()
+        assert isinstance(joblib.load(path), cls)
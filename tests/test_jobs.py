@@ -0,0 +1,130 @@
+import os
+import time
+
+import pytest
+
+from utils import jobs
+
+
+@pytest.fixture(autouse=True)
+def job_store(tmp_path, monkeypatch):
+    # A private queue that no worker watches: tests claim and run jobs themselves
+    monkeypatch.setenv("JOBS_PATH", str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setenv("JOB_WORKER", "external")
+    monkeypatch.setattr(jobs, "RESULTS_DIR", str(tmp_path / "job_results"))
+    monkeypatch.setattr(jobs, "INPUTS_DIR", str(tmp_path / "job_inputs"))
+    monkeypatch.setitem(jobs.TASKS, "echo", lambda params, job: {"echo": params})
+    return tmp_path
+
+
+def _submit_in_order(n):
+    job_ids = []
+    for i in range(n):
+        job_ids.append(jobs.submit("echo", {"i": i}))
+        time.sleep(0.01)  # distinct created_at
+    return job_ids
+
+
+# ------------------ Queue ------------------ #
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError):
+        jobs.submit("no_such_task")
+
+
+def test_claim_next_takes_the_oldest_queued_job():
+    first, second = _submit_in_order(2)
+
+    assert jobs.claim_next() == first
+    job = jobs.get_job(first)
+    assert job["status"] == jobs.RUNNING and job["attempts"] == 1
+    assert jobs.claim_next() == second
+    assert jobs.claim_next() is None
+
+
+def test_executed_job_result_can_be_loaded():
+    job_id = jobs.submit("echo", {"answer": 42})
+    jobs.execute(jobs.claim_next())
+
+    job = jobs.get_job(job_id)
+    assert job["status"] == jobs.SUCCEEDED and job["progress"] == 1.0
+    assert jobs.load_result(job_id) == {"echo": {"answer": 42}}
+
+
+def test_failed_task_records_the_error(monkeypatch):
+    def broken(params, job):
+        raise RuntimeError("bad input")
+
+    monkeypatch.setitem(jobs.TASKS, "broken", broken)
+    job_id = jobs.submit("broken")
+    jobs.execute(jobs.claim_next())
+
+    job = jobs.get_job(job_id)
+    assert job["status"] == jobs.FAILED
+    assert job["message"] == "RuntimeError: bad input"
+    assert jobs.load_result(job_id) is None
+
+
+# ------------------ Cancellation ------------------ #
+def test_cancelling_a_queued_job_is_immediate():
+    job_id = jobs.submit("echo")
+    jobs.cancel(job_id)
+
+    assert jobs.get_job(job_id)["status"] == jobs.CANCELLED
+    assert jobs.claim_next() is None
+
+
+def test_cancelling_a_running_job_stops_it_at_the_next_progress_update():
+    job_id = jobs.submit("echo")
+    jobs.claim_next()
+    jobs.cancel(job_id)
+
+    job = jobs.get_job(job_id)
+    assert job["status"] == jobs.RUNNING and job["cancel_requested"]
+    with pytest.raises(jobs.JobCancelled):
+        jobs.JobContext(job_id).progress(0.5)
+
+
+# ------------------ Crashed Workers ------------------ #
+def test_stale_running_jobs_are_requeued_then_failed():
+    job_id = jobs.submit("echo")
+    for attempt in range(1, jobs.MAX_ATTEMPTS + 1):
+        assert jobs.claim_next() == job_id
+        # The worker died without sending heartbeats
+        jobs._update(job_id, heartbeat=time.time() - jobs.STALE_AFTER - 1)
+        jobs.requeue_stale()
+        expected = jobs.QUEUED if attempt < jobs.MAX_ATTEMPTS else jobs.FAILED
+        assert jobs.get_job(job_id)["status"] == expected
+    assert jobs.claim_next() is None
+
+
+def test_jobs_with_recent_heartbeats_are_left_running():
+    job_id = jobs.submit("echo")
+    jobs.claim_next()
+    jobs.requeue_stale()
+    assert jobs.get_job(job_id)["status"] == jobs.RUNNING
+
+
+# ------------------ Retention ------------------ #
+def test_purge_expired_deletes_old_jobs_with_their_own_files_only(job_store):
+    kept_input = job_store / "kept.csv"
+    kept_input.write_text("Age\n50\n")
+    uploaded = jobs.save_input(b"Age\n50\n")
+    old_upload, old_external, recent = (
+        jobs.submit("echo", {"input_path": uploaded}),
+        jobs.submit("echo", {"input_path": str(kept_input)}),
+        jobs.submit("echo"),
+    )
+    for _ in range(3):
+        jobs.execute(jobs.claim_next())
+    for job_id in (old_upload, old_external):
+        jobs._update(job_id, finished_at=time.time() - 3600)
+    queued = jobs.submit("echo")
+    old_result = jobs.get_job(old_upload)["result_path"]
+
+    assert jobs.purge_expired(ttl=60) == 2
+    assert jobs.get_job(old_upload) is None and jobs.get_job(old_external) is None
+    assert jobs.get_job(recent) is not None and jobs.get_job(queued) is not None
+    assert not os.path.exists(old_result) and not os.path.exists(uploaded)
+    # Files the job did not create are never deleted
+    assert kept_input.exists()
+    assert os.path.exists(jobs.get_job(recent)["result_path"])
@@ -0,0 +1,112 @@
+import threading
+
+import numpy as np
+import pytest
+
+from utils.serving import ModelRouter, ShadowScorer
+
+
+class FakeModel:
+    def __init__(self, version, probability=0.75, gate=None, error=None):
+        self.version = version
+        self.probability = probability
+        self.gate = gate
+        self.error = error
+
+    def score(self, X):
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        return np.ones(len(X), dtype=int), np.full(len(X), self.probability)
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.records = []
+
+    def log(self, record):
+        self.records.append(record)
+        return True
+
+
+@pytest.fixture
+def scorer():
+    scorer = ShadowScorer(max_workers=1, max_pending=1, logger=RecordingLogger())
+    yield scorer
+    scorer.close()
+
+
+# ------------------ Routing ------------------ #
+def test_routing_is_sticky_per_key():
+    router = ModelRouter("primary.pkl", canary="canary.pkl", canary_fraction=0.5, scorer=object())
+    assert all(router.route(f"key-{i}") is router.route(f"key-{i}") for i in range(200))
+
+
+def test_canary_answers_its_share_of_requests():
+    router = ModelRouter("primary.pkl", canary="canary.pkl", canary_fraction=0.2, scorer=object())
+    share = sum(router.route(f"key-{i}") is router.canary for i in range(5000)) / 5000
+    assert share == pytest.approx(0.2, abs=0.02)
+
+
+def test_without_canary_the_primary_answers_everything():
+    router = ModelRouter("primary.pkl", canary_fraction=0.5, scorer=object())
+    assert router.canary_fraction == 0.0
+    assert all(router.route(f"key-{i}") is router.primary for i in range(100))
+
+
+def test_invalid_canary_fraction_is_rejected():
+    with pytest.raises(ValueError):
+        ModelRouter("primary.pkl", canary="canary.pkl", canary_fraction=1.5)
+
+
+def test_shadows_are_every_other_model():
+    router = ModelRouter(
+        "primary.pkl", shadows=["svm", "primary.pkl", "svm", "canary.pkl"], canary="canary.pkl",
+        canary_fraction=0.1, scorer=object(),
+    )
+    assert [model.name for model in router.shadows] == ["svm"]
+    assert [model.name for model in router.shadows_for(router.primary)] == ["canary.pkl", "svm"]
+    assert [model.name for model in router.shadows_for(router.canary)] == ["primary.pkl", "svm"]
+
+
+# ------------------ Shadow Scoring ------------------ #
+def test_shadow_scores_are_logged_per_row(scorer):
+    served = FakeModel("served@1", probability=0.25)
+    assert scorer.submit(np.zeros((3, 2)), served, [0, 0, 0], [0.25] * 3, 1.0, [FakeModel("shadow@1")])
+    scorer.wait(timeout=5)
+
+    records = scorer.logger.records
+    assert len(records) == 3
+    assert {(r.served_version, r.shadow_version, r.served_prediction, r.shadow_prediction) for r in records} == {
+        ("served@1", "shadow@1", 0, 1)
+    }
+
+
+def test_no_shadows_means_nothing_is_queued(scorer):
+    assert not scorer.submit(np.zeros((1, 2)), FakeModel("served@1"), [0], [0.25], 1.0, [])
+    assert scorer.skipped == 0
+
+
+def test_jobs_beyond_max_pending_are_skipped(scorer):
+    gate = threading.Event()
+    served = FakeModel("served@1")
+    assert scorer.submit(np.zeros((1, 2)), served, [0], [0.25], 1.0, [FakeModel("slow@1", gate=gate)])
+    assert not scorer.submit(np.zeros((1, 2)), served, [0], [0.25], 1.0, [FakeModel("shadow@1")])
+    assert scorer.skipped == 1
+
+    gate.set()
+    scorer.wait(timeout=5)
+    assert scorer.submit(np.zeros((1, 2)), served, [0], [0.25], 1.0, [FakeModel("shadow@1")])
+    scorer.wait(timeout=5)
+    assert scorer.skipped == 1
+
+
+def test_failed_shadow_jobs_are_counted_and_logged(scorer, caplog):
+    broken = FakeModel("broken@1", error=RuntimeError("model file is corrupt"))
+    scorer.submit(np.zeros((1, 2)), FakeModel("served@1"), [0], [0.25], 1.0, [broken])
+    scorer.wait(timeout=5)
+
+    assert scorer.failed == 1
+    assert scorer.logger.records == []
+    assert "model file is corrupt" in caplog.text
@@ -0,0 +1,52 @@
+import os
+
+import pandas as pd
+import pytest
+
+from utils.streaming_preprocessing import ZERO_REPLACE_COLUMNS, model_features, replace_zeros, run
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET = os.path.join(ROOT, "data", "diabetes.csv")
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    # The pipeline reads data/bin_config.pkl relative to the repo root, like the app
+    monkeypatch.chdir(ROOT)
+
+
+def test_replace_zeros_always_returns_float():
+    chunk = pd.DataFrame({col: [1, 2, 3] for col in ZERO_REPLACE_COLUMNS})
+    replaced = replace_zeros(chunk, {col: 0.5 for col in ZERO_REPLACE_COLUMNS})
+    assert all(replaced[col].dtype == "float64" for col in ZERO_REPLACE_COLUMNS)
+
+
+def test_small_chunks_parquet_matches_csv(tmp_path):
+    pytest.importorskip("pyarrow")
+    # Chunks of 5 rows: many of them have no zero Insulin, so the column dtype must not depend on the chunk
+    csv_stats = run(DATASET, str(tmp_path / "csv"), chunksize=5, fmt="csv")
+    parquet_stats = run(DATASET, str(tmp_path / "parquet"), chunksize=5, fmt="parquet")
+
+    assert parquet_stats["rows_out"] == csv_stats["rows_out"] > 0
+    for csv_path, parquet_path in zip(csv_stats["outputs"], parquet_stats["outputs"]):
+        from_csv = pd.read_csv(csv_path)
+        from_parquet = pd.read_parquet(parquet_path)
+        assert len(from_parquet) == csv_stats["rows_out"]
+        pd.testing.assert_frame_equal(from_parquet, from_csv, check_dtype=False)
+
+
+def test_model_features_bins_like_training():
+    import joblib
+
+    bin_config = joblib.load(os.path.join(ROOT, "data", "bin_config.pkl"))
+    columns = joblib.load(os.path.join(ROOT, "data", "columns.pkl"))
+    raw = pd.DataFrame({col: [1, 1, 1] for col in ZERO_REPLACE_COLUMNS + ["Pregnancies", "DiabetesPedigreeFunction"]})
+    raw["Age"] = [19, 29, 110]
+    raw["BMI"] = [24.95, 30.0, 18.45]
+
+    features = model_features(raw, bin_config, columns)
+    assert list(features.columns) == [col for col in columns if col != "Outcome"]
+    # Bins are closed on the left, as pd.cut(right=False) in the notebook; ages past the last edge are Elderly
+    assert features.filter(like="AgeGroup_").idxmax(axis=1).tolist() == ["AgeGroup_Young Adult", "AgeGroup_Adult", "AgeGroup_Elderly"]
+    assert features.filter(like="BMIGroup_").idxmax(axis=1).tolist() == ["BMIGroup_Normal", "BMIGroup_Obese", "BMIGroup_Underweight"]
+    assert (features.filter(like="Group_").sum(axis=1) == 2).all()
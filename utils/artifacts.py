@@ -0,0 +1,45 @@
+"""Cached loaders for the model artifacts and datasets used by the pages.
+
+Each file is loaded once per process and re-read only when it changes on disk
+(the cache key includes the file's modification time and size).
+"""
+import os
+import uuid
+
+import joblib
+import pandas as pd
+
+from utils.cache import get_cache, make_key
+
+
+def _file_key(path, *extra):
+    stat = os.stat(path)
+    return make_key(os.path.abspath(path), stat.st_mtime_ns, stat.st_size, *extra)
+
+
+def load_artifact(path, namespace="artifacts"):
+    """Unpickle a joblib artifact (model, scaler, column list, ...)."""
+    return get_cache().get_or_compute(namespace, _file_key(path), lambda: joblib.load(path))
+
+
+def read_pickle(path):
+    """Load a pickled DataFrame/Series. Callers must treat the result as read-only."""
+    return get_cache().get_or_compute("datasets", _file_key(path), lambda: pd.read_pickle(path))
+
+
+def read_csv(path, **kwargs):
+    """Parse a CSV once per process. Callers must treat the result as read-only."""
+    key = _file_key(path, sorted(kwargs.items()))
+    return get_cache().get_or_compute("datasets", key, lambda: pd.read_csv(path, **kwargs))
+
+
+def dump_atomic(obj, path):
+    """``joblib.dump`` to a temp file and rename it into place, so readers never see a partial file."""
+    tmp_path = os.path.join(os.path.dirname(path) or ".", f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp")
+    try:
+        joblib.dump(obj, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,347 @@
+"""Asynchronous audit log of every prediction made in the app.
+
+The request path only calls ``AuditLogger.log``, which puts the record on a
+bounded in-memory queue and returns immediately. A background thread drains
+the queue and writes records in batches to one of two sinks:
+
+- ``SQLiteSink`` (default): a SQLite database in WAL mode, so the monitoring
+  page can read while the writer appends.
+- ``ParquetSink``: rotating Parquet files (needs ``pyarrow``).
+
+Each kind of record has its own table (``predictions`` for served
+predictions, ``shadow_scores`` for shadow/canary comparisons, see
+``utils.serving``) and its own logger, all sharing one database or directory.
+
+When the queue is full the record is dropped (after waiting up to
+``block_timeout`` seconds, 0 by default) and counted in ``dropped`` rather
+than slowing the prediction down.
+
+Configuration (environment variables): ``AUDIT_LOG_BACKEND`` (``sqlite`` or
+``parquet``) and ``AUDIT_LOG_PATH``.
+"""
+import atexit
+import glob
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+
+import pandas as pd
+
+# Server log, not the audit log
+log = logging.getLogger(__name__)
+
+DEFAULT_SQLITE_PATH = os.path.join(".cache", "audit_log.sqlite3")
+DEFAULT_PARQUET_DIR = os.path.join(".cache", "audit_log")
+
+
+@dataclass
+class PredictionRecord:
+    inputs: dict
+    prediction: int
+    probability: float
+    model_version: str
+    latency_ms: float
+    timestamp: float = field(default_factory=time.time)
+
+
+@dataclass
+class ShadowRecord:
+    """A shadow model's score for a request that another model answered."""
+
+    served_version: str
+    shadow_version: str
+    served_prediction: int
+    served_probability: float
+    shadow_prediction: int
+    shadow_probability: float
+    served_latency_ms: float
+    shadow_latency_ms: float
+    timestamp: float = field(default_factory=time.time)
+
+
+_version_cache = {}
+
+
+def model_version(path):
+    """Short content hash identifying a model artifact."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _version_cache:
+        with open(path, "rb") as f:
+            _version_cache[key] = f"{os.path.basename(path)}@{hashlib.sha256(f.read()).hexdigest()[:12]}"
+    return _version_cache[key]
+
+
+def _to_row(record):
+    row = asdict(record)
+    if "inputs" in row:
+        row["inputs"] = json.dumps(row["inputs"], sort_keys=True, default=float)
+    return row
+
+
+# Column name -> SQLite type, per table
+SCHEMAS = {
+    "predictions": {
+        "timestamp": "REAL", "model_version": "TEXT", "prediction": "INTEGER",
+        "probability": "REAL", "latency_ms": "REAL", "inputs": "TEXT",
+    },
+    "shadow_scores": {
+        "timestamp": "REAL", "served_version": "TEXT", "shadow_version": "TEXT",
+        "served_prediction": "INTEGER", "served_probability": "REAL",
+        "shadow_prediction": "INTEGER", "shadow_probability": "REAL",
+        "served_latency_ms": "REAL", "shadow_latency_ms": "REAL",
+    },
+}
+COLUMNS = list(SCHEMAS["predictions"])
+
+
+# ------------------ Sinks ------------------ #
+class SQLiteSink:
+    def __init__(self, path=DEFAULT_SQLITE_PATH, table="predictions"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.table = table
+        self.columns = list(SCHEMAS[table])
+        columns_sql = ", ".join(f"{name} {kind}" for name, kind in SCHEMAS[table].items())
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY AUTOINCREMENT, {columns_sql})")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_time ON {table} (timestamp)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def write_batch(self, records):
+        rows = [tuple(_to_row(r)[c] for c in self.columns) for r in records]
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES ({', '.join('?' * len(self.columns))})",
+                    rows,
+                )
+        finally:
+            conn.close()
+
+    def close(self):
+        pass
+
+    def _where(self, since):
+        return (" WHERE timestamp >= ?", [since]) if since is not None else ("", [])
+
+    def _read(self, sql, params):
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(sql, conn, params=params)
+        finally:
+            conn.close()
+
+    def query(self, since=None, limit=None, columns=None):
+        unknown = set(columns or ()) - set(self.columns)
+        if unknown:
+            raise ValueError(f"Unknown {self.table} columns: {', '.join(sorted(unknown))}")
+        where, params = self._where(since)
+        sql = f"SELECT {', '.join(columns or self.columns)} FROM {self.table}{where} ORDER BY timestamp DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return self._read(sql, params)
+
+    def count(self, since=None):
+        where, params = self._where(since)
+        return int(self._read(f"SELECT COUNT(*) AS n FROM {self.table}{where}", params)["n"].iloc[0])
+
+
+class ParquetSink:
+    """Appends batches to a Parquet file, rotating after ``rows_per_file`` rows or ``seconds_per_file``.
+
+    A file becomes readable once it is rotated out, so ``seconds_per_file``
+    bounds how stale ``query`` results can be.
+    """
+
+    def __init__(self, directory=DEFAULT_PARQUET_DIR, table="predictions", rows_per_file=100_000, seconds_per_file=300):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as exc:
+            raise ImportError("AUDIT_LOG_BACKEND=parquet requires the 'pyarrow' package: pip install pyarrow") from exc
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.table = table
+        self.columns = list(SCHEMAS[table])
+        self.rows_per_file = rows_per_file
+        self.seconds_per_file = seconds_per_file
+        self._writer = None
+        self._rows_in_file = 0
+        self._opened_at = 0.0
+
+    def _rotate(self, schema):
+        import pyarrow.parquet as pq
+
+        self.close()
+        path = os.path.join(self.directory, f"{self.table}-{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns()}.parquet")
+        self._writer = pq.ParquetWriter(path, schema)
+        self._rows_in_file = 0
+        self._opened_at = time.time()
+
+    def write_batch(self, records):
+        import pyarrow as pa
+
+        table = pa.Table.from_pylist([{c: _to_row(r)[c] for c in self.columns} for r in records])
+        if (
+            self._writer is None
+            or self._rows_in_file >= self.rows_per_file
+            or time.time() - self._opened_at >= self.seconds_per_file
+        ):
+            self._rotate(table.schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+        self._rows_in_file += len(records)
+
+    def close(self):
+        # Closing writes the Parquet footer; only closed files are readable.
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def query(self, since=None, limit=None, columns=None):
+        columns = list(columns or self.columns)
+        # Parquet is columnar: only the requested columns (plus timestamp, to filter and sort) are read
+        read_columns = list(dict.fromkeys(columns + ["timestamp"]))
+        frames = []
+        for path in sorted(glob.glob(os.path.join(self.directory, f"{self.table}-*.parquet"))):
+            try:
+                frames.append(pd.read_parquet(path, columns=read_columns))
+            except Exception:
+                continue  # file still being written
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        df = pd.concat(frames, ignore_index=True)
+        if since is not None:
+            df = df[df["timestamp"] >= since]
+        df = df.sort_values("timestamp", ascending=False)[columns]
+        return df if limit is None else df.head(limit)
+
+    def count(self, since=None):
+        return len(self.query(since=since, columns=["timestamp"]))
+
+
+# ------------------ Logger ------------------ #
+class AuditLogger:
+    def __init__(self, sink, max_queue=10_000, batch_size=500, flush_interval=1.0, block_timeout=0.0):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self.written = 0
+        # Request threads and the writer both count drops
+        self._mutex = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        self._thread.start()
+
+    def log(self, record):
+        """Queue a record without doing any I/O. Returns False if it was dropped."""
+        try:
+            if self.block_timeout > 0:
+                self._queue.put(record, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self._count_dropped(1)
+            return False
+
+    def _count_dropped(self, n):
+        with self._mutex:
+            self.dropped += n
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def _drain(self, first):
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        try:
+            self.sink.write_batch(batch)
+            self.written += len(batch)
+        except Exception as exc:
+            # Never let a bad write kill the writer thread
+            self._count_dropped(len(batch))
+            log.warning("Audit log write failed (%d records dropped): %s", len(batch), exc)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _run(self):
+        while not self._stop.is_set() or not self._queue.empty():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            self._write(self._drain(first))
+
+    def flush(self):
+        """Block until every queued record has been written."""
+        self._queue.join()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.sink.close()
+
+    def query(self, since=None, limit=None, columns=None):
+        return self.sink.query(since=since, limit=limit, columns=columns)
+
+    def count(self, since=None):
+        return self.sink.count(since=since)
+
+
+def sink_from_env(table="predictions"):
+    backend = os.environ.get("AUDIT_LOG_BACKEND", "sqlite").lower()
+    if backend == "sqlite":
+        return SQLiteSink(os.environ.get("AUDIT_LOG_PATH", DEFAULT_SQLITE_PATH), table=table)
+    if backend == "parquet":
+        return ParquetSink(os.environ.get("AUDIT_LOG_PATH", DEFAULT_PARQUET_DIR), table=table)
+    raise ValueError(f"Unknown AUDIT_LOG_BACKEND: {backend!r} (expected sqlite or parquet)")
+
+
+_loggers = {}
+_logger_mutex = threading.Lock()
+
+
+def get_audit_logger(table="predictions"):
+    """Process-wide audit logger for ``table``, started on first use and flushed at exit."""
+    if table not in _loggers:
+        with _logger_mutex:
+            if table not in _loggers:
+                logger = AuditLogger(sink_from_env(table))
+                atexit.register(logger.close)
+                _loggers[table] = logger
+    return _loggers[table]
+
+
+def read_audit_log(since=None, limit=None, table="predictions", columns=None):
+    """Logged records from ``table``, newest first."""
+    return get_audit_logger(table).query(since=since, limit=limit, columns=columns)
+
+
+def count_audit_log(since=None, table="predictions"):
+    """Number of logged records in ``table``, without loading them."""
+    return get_audit_logger(table).count(since=since)
@@ -0,0 +1,264 @@
+"""Bootstrap confidence intervals for the test-set performance metrics.
+
+The test split only holds ~123 rows, so a single accuracy/F1 number hides a
+lot of sampling noise. This module resamples the test predictions thousands
+of times and reports percentile intervals for each metric.
+
+Resamples are drawn as an index matrix (one row per resample) and turned into
+per-row counts, so every metric is computed for all resamples at once with
+array operations. Large test sets are split across a process pool.
+
+Run ``python -m utils.bootstrap`` to (re)compute the cached results.
+"""
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.artifacts import dump_atomic, load_artifact, read_pickle
+from utils.cache import get_cache, make_key
+
+MODEL_PATH = os.path.join("data", "best_logistic_model.pkl")
+SCALER_PATH = os.path.join("data", "scaler.pkl")
+COLUMNS_PATH = os.path.join("data", "columns.pkl")
+X_TEST_PATH = os.path.join("data", "X_test.pkl")
+Y_TEST_PATH = os.path.join("data", "y_test.pkl")
+
+# Cached next to the model artifact it describes
+RESULTS_PATH = os.path.join("data", "bootstrap_metrics.pkl")
+
+METRICS = ["Accuracy", "Precision", "Recall", "F1-Score", "AUC"]
+
+# Upper bound on resamples x rows held in memory at once
+MAX_BATCH_ELEMENTS = 20_000_000
+# Below this many resamples x rows a process pool costs more than it saves
+PARALLEL_THRESHOLD = 5_000_000
+# Progress updates per run when a progress callback is given
+PROGRESS_STEPS = 20
+
+
+# ------------------ Vectorized Metrics ------------------ #
+def _resample_counts(idx, n):
+    """Turn a (B, n) index matrix into a (B, n) matrix of draw counts."""
+    n_resamples = idx.shape[0]
+    offsets = (np.arange(n_resamples) * n)[:, None]
+    flat = np.bincount((idx + offsets).ravel(), minlength=n_resamples * n)
+    return flat.reshape(n_resamples, n)
+
+
+def _safe_divide(num, den):
+    out = np.zeros_like(num, dtype=float)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+def _metrics_from_counts(counts, y_true, y_pred, score_order, group_starts):
+    """Compute every metric for each row of ``counts`` at once."""
+    pos = y_true == 1
+    predicted_pos = y_pred == 1
+
+    n = counts.sum(axis=1).astype(float)
+    tp = counts[:, pos & predicted_pos].sum(axis=1)
+    fp = counts[:, ~pos & predicted_pos].sum(axis=1)
+    fn = counts[:, pos & ~predicted_pos].sum(axis=1)
+    tn = n - tp - fp - fn
+
+    accuracy = (tp + tn) / n
+    precision = _safe_divide(tp, tp + fp)
+    recall = _safe_divide(tp, tp + fn)
+    f1 = _safe_divide(2 * precision * recall, precision + recall)
+
+    # AUC as the Mann-Whitney statistic on weighted, tied score groups:
+    # each positive beats every negative below its score and ties count half.
+    sorted_counts = counts[:, score_order]
+    sorted_pos = pos[score_order]
+    pos_per_group = np.add.reduceat(sorted_counts * sorted_pos, group_starts, axis=1)
+    neg_per_group = np.add.reduceat(sorted_counts * ~sorted_pos, group_starts, axis=1)
+    neg_below = np.cumsum(neg_per_group, axis=1) - neg_per_group
+    wins = (pos_per_group * (neg_below + 0.5 * neg_per_group)).sum(axis=1)
+    n_pos = pos_per_group.sum(axis=1)
+    n_neg = neg_per_group.sum(axis=1)
+    auc = np.full(len(counts), np.nan)
+    valid = (n_pos > 0) & (n_neg > 0)
+    auc[valid] = wins[valid] / (n_pos[valid] * n_neg[valid])
+
+    return np.column_stack([accuracy, precision, recall, f1, auc])
+
+
+def _bootstrap_chunk(y_true, y_pred, y_prob, n_resamples, seed, progress=None):
+    """Run ``n_resamples`` resamples in batches that fit in memory."""
+    n = len(y_true)
+    rng = np.random.default_rng(seed)
+    score_order = np.argsort(y_prob, kind="stable")
+    sorted_scores = y_prob[score_order]
+    group_starts = np.flatnonzero(np.r_[True, sorted_scores[1:] != sorted_scores[:-1]])
+
+    batch_size = max(1, MAX_BATCH_ELEMENTS // max(n, 1))
+    if progress is not None:
+        # Smaller batches draw the same resamples, but let progress be reported along the way
+        batch_size = min(batch_size, max(1, -(-n_resamples // PROGRESS_STEPS)))
+    results = []
+    for start in range(0, n_resamples, batch_size):
+        size = min(batch_size, n_resamples - start)
+        idx = rng.integers(0, n, size=(size, n))
+        counts = _resample_counts(idx, n)
+        results.append(_metrics_from_counts(counts, y_true, y_pred, score_order, group_starts))
+        if progress is not None:
+            progress((start + size) / n_resamples)
+    return np.vstack(results)
+
+
+def point_metrics(y_true, y_pred, y_prob):
+    """Metrics on the original (un-resampled) test set."""
+    y_true = np.asarray(y_true).astype(int)
+    y_pred = np.asarray(y_pred).astype(int)
+    y_prob = np.asarray(y_prob, dtype=float)
+    counts = np.ones((1, len(y_true)), dtype=np.int64)
+    order = np.argsort(y_prob, kind="stable")
+    sorted_scores = y_prob[order]
+    starts = np.flatnonzero(np.r_[True, sorted_scores[1:] != sorted_scores[:-1]])
+    return dict(zip(METRICS, _metrics_from_counts(counts, y_true, y_pred, order, starts)[0]))
+
+
+def bootstrap_metrics(y_true, y_pred, y_prob, n_resamples=5000, confidence=0.95, seed=42, n_jobs=None, progress=None):
+    """Percentile bootstrap intervals for accuracy, precision, recall, F1 and AUC.
+
+    Returns a DataFrame indexed by metric with ``Estimate``, ``Lower`` and
+    ``Upper`` columns. Resamples are spread over ``n_jobs`` worker processes
+    when the test set is large enough to make it worthwhile. ``progress`` is
+    called with the fraction of resamples done; it may raise to stop the run.
+    """
+    y_true = np.asarray(y_true).astype(int)
+    y_pred = np.asarray(y_pred).astype(int)
+    y_prob = np.asarray(y_prob, dtype=float)
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    seeds = np.random.SeedSequence(seed)
+    if n_jobs > 1 and n_resamples * len(y_true) >= PARALLEL_THRESHOLD:
+        shares = [len(s) for s in np.array_split(np.arange(n_resamples), n_jobs) if len(s)]
+        child_seeds = seeds.spawn(len(shares))
+        # spawn: this also runs inside the Streamlit server, and forking it with running threads is not safe
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(shares), mp_context=context) as pool:
+            futures = {
+                pool.submit(_bootstrap_chunk, y_true, y_pred, y_prob, share, child): i
+                for i, (share, child) in enumerate(zip(shares, child_seeds))
+            }
+            parts, done = [None] * len(shares), 0
+            for future in as_completed(futures):
+                i = futures[future]
+                parts[i] = future.result()
+                done += shares[i]
+                if progress is not None:
+                    progress(done / n_resamples)
+            samples = np.vstack(parts)
+    else:
+        samples = _bootstrap_chunk(y_true, y_pred, y_prob, n_resamples, seeds, progress)
+
+    alpha = (1 - confidence) / 2
+    lower, upper = np.nanpercentile(samples, [100 * alpha, 100 * (1 - alpha)], axis=0)
+    estimate = point_metrics(y_true, y_pred, y_prob)
+    return pd.DataFrame(
+        {"Estimate": [estimate[m] for m in METRICS], "Lower": lower, "Upper": upper},
+        index=pd.Index(METRICS, name="Metric"),
+    )
+
+
+# ------------------ Cached Results ------------------ #
+def _artifact_signature():
+    """Hash of the model and test-set files the cached results were built from."""
+    digest = hashlib.sha256()
+    for path in (MODEL_PATH, SCALER_PATH, COLUMNS_PATH, X_TEST_PATH, Y_TEST_PATH):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def compute_test_predictions():
+    """Score the saved test split with the saved logistic regression model."""
+    model = load_artifact(MODEL_PATH)
+    scaler = load_artifact(SCALER_PATH)
+    columns = load_artifact(COLUMNS_PATH)
+    X_test = read_pickle(X_TEST_PATH)
+    y_test = read_pickle(Y_TEST_PATH)
+
+    X_test = X_test[[col for col in columns if col != "Outcome"]]
+    X_test_scaled = scaler.transform(X_test)
+    y_pred = model.predict(X_test_scaled)
+    y_prob = model.predict_proba(X_test_scaled)[:, 1]
+    return y_test.to_numpy(), y_pred, y_prob
+
+
+def test_predictions():
+    """``compute_test_predictions`` shared through the evaluations cache."""
+    key = make_key("test_predictions", _artifact_signature())
+    return get_cache().get_or_compute("evaluations", key, compute_test_predictions)
+
+
+def compute_results(n_resamples=5000, confidence=0.95, seed=42, progress=None):
+    """Bootstrap the saved model's test predictions into a picklable results dict."""
+    y_true, y_pred, y_prob = test_predictions()
+    table = bootstrap_metrics(
+        y_true, y_pred, y_prob, n_resamples=n_resamples, confidence=confidence, seed=seed, progress=progress
+    )
+    return {
+        "signature": _artifact_signature(),
+        "n_resamples": n_resamples,
+        "confidence": confidence,
+        "n_test": len(y_true),
+        # Plain floats so the cache does not depend on the pandas/numpy pickle format
+        "metrics": {m: {k: float(v) for k, v in row.items()} for m, row in table.iterrows()},
+    }
+
+
+def compute_and_save(n_resamples=5000, confidence=0.95, seed=42, path=RESULTS_PATH, progress=None):
+    results = compute_results(n_resamples=n_resamples, confidence=confidence, seed=seed, progress=progress)
+    # Pages may be reading the file while it is rewritten
+    dump_atomic(results, path)
+    return results
+
+
+def results_table(results):
+    """Rebuild the metrics DataFrame from cached results."""
+    table = pd.DataFrame.from_dict(results["metrics"], orient="index")
+    table.index.name = "Metric"
+    return table
+
+
+def _read_or_compute(path, signature):
+    if os.path.exists(path):
+        try:
+            results = joblib.load(path)
+        except Exception:
+            # A truncated or foreign file is only a stale cache: rebuild it
+            results = {}
+        if isinstance(results, dict) and results.get("signature") == signature:
+            return results
+    return compute_and_save(path=path)
+
+
+def load_bootstrap_results(path=RESULTS_PATH):
+    """Read cached results, recomputing them if missing or built from older artifacts."""
+    signature = _artifact_signature()
+    # The file's mtime is part of the key so results recomputed by a background job are picked up
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    key = make_key("bootstrap", os.path.abspath(path), mtime, signature)
+    return get_cache().get_or_compute("evaluations", key, lambda: _read_or_compute(path, signature))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compute bootstrap confidence intervals for the test metrics.")
+    parser.add_argument("--resamples", type=int, default=5000)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    results = compute_and_save(n_resamples=args.resamples, confidence=args.confidence, seed=args.seed)
+    print(f"✅ Bootstrap results saved to: {RESULTS_PATH}")
+    print(results_table(results).round(4))
@@ -0,0 +1,536 @@
+"""Pluggable cache shared by all pages (and, with a shared backend, all replicas).
+
+Every value lives in a namespace with its own TTL and LRU size limit
+(see ``NAMESPACES``). Lookups go through a process-local memory layer first;
+namespaces marked ``shared`` are also stored in the configured backend so that
+several Streamlit replicas reuse each other's results instead of recomputing
+them.
+
+Backend selection (environment variables):
+
+- ``CACHE_BACKEND=memory`` (default): in-process only.
+- ``CACHE_BACKEND=sqlite``: on-disk SQLite file at ``CACHE_PATH`` in WAL mode
+  with memory-mapped reads, shared by every process on the host/volume.
+- ``CACHE_BACKEND=redis``: any Redis-protocol server at ``CACHE_REDIS_URL``
+  (needs the ``redis`` package).
+- ``CACHE_BACKEND=fakeredis``: in-process stand-in for Redis, for tests.
+
+``Cache.get_or_compute`` is single-flight: concurrent callers for the same key
+wait for one computation instead of all running it (a stampede lock is taken
+in the shared backend, so this holds across processes too).
+"""
+import hashlib
+import os
+import pickle
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class NamespacePolicy:
+    ttl: float | None = None  # seconds; None means never expire
+    max_entries: int | None = None  # LRU limit; None means unbounded
+    shared: bool = False  # also store in the shared backend
+
+
+# Loaded artifacts are process-local: unpickling a model from a shared store
+# costs as much as reading it from disk. Computed results are shared.
+NAMESPACES = {
+    "artifacts": NamespacePolicy(ttl=None, max_entries=32),
+    "datasets": NamespacePolicy(ttl=None, max_entries=32),
+    "job_results": NamespacePolicy(ttl=None, max_entries=64),
+    "evaluations": NamespacePolicy(ttl=24 * 3600, max_entries=64, shared=True),
+    "predictions": NamespacePolicy(ttl=3600, max_entries=10_000, shared=True),
+}
+DEFAULT_POLICY = NamespacePolicy(ttl=3600, max_entries=1000, shared=True)
+
+LRU_TOUCH_INTERVAL = 60  # seconds between last-access updates of a SQLite entry
+LOCK_TTL = 60  # seconds a stampede lock is held before others may take over
+LOCK_POLL_INTERVAL = 0.05
+
+# Deletes a Redis lock only if it still holds the caller's token
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def make_key(*parts):
+    """Stable key from arbitrary (repr-able) parts."""
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+
+def _lock_token():
+    return secrets.token_hex(16)
+
+
+# ------------------ Backends ------------------ #
+class MemoryBackend:
+    """In-process store. Values are kept as Python objects, not serialized."""
+
+    serializes = False
+
+    def __init__(self):
+        self._data = {}  # namespace -> OrderedDict(key -> (expires_at, value))
+        self._locks = {}
+        self._mutex = threading.Lock()
+
+    def get(self, namespace, key):
+        with self._mutex:
+            entries = self._data.get(namespace)
+            if entries is None or key not in entries:
+                return None
+            expires_at, value = entries[key]
+            if expires_at is not None and expires_at <= time.time():
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return (value,)
+
+    def set(self, namespace, key, value, ttl=None, max_entries=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._mutex:
+            entries = self._data.setdefault(namespace, OrderedDict())
+            entries[key] = (expires_at, value)
+            entries.move_to_end(key)
+            while max_entries and len(entries) > max_entries:
+                entries.popitem(last=False)
+
+    def delete(self, namespace, key):
+        with self._mutex:
+            self._data.get(namespace, {}).pop(key, None)
+
+    def clear(self, namespace=None):
+        with self._mutex:
+            if namespace is None:
+                self._data.clear()
+            else:
+                self._data.pop(namespace, None)
+
+    def acquire_lock(self, name, ttl):
+        """Take the lock ``name``. Returns an owner token, or None if someone else holds it."""
+        now = time.time()
+        with self._mutex:
+            held = self._locks.get(name)
+            if held is not None and held[0] > now:
+                return None
+            token = _lock_token()
+            self._locks[name] = (now + ttl, token)
+            return token
+
+    def release_lock(self, name, token):
+        """Release the lock if ``token`` still owns it (it may have expired and been taken over)."""
+        with self._mutex:
+            held = self._locks.get(name)
+            if held is not None and held[1] == token:
+                del self._locks[name]
+
+
+class SQLiteBackend:
+    """On-disk store shared by every process that can see ``path``.
+
+    Hits only refresh an entry's LRU timestamp once per ``touch_interval``, so
+    most reads do not take SQLite's write lock.
+    """
+
+    serializes = True
+
+    def __init__(self, path, mmap_size=256 * 1024 * 1024, touch_interval=LRU_TOUCH_INTERVAL):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.mmap_size = mmap_size
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " namespace TEXT, key TEXT, value BLOB, expires_at REAL, last_access REAL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (namespace, last_access)")
+            lock_columns = [row[1] for row in conn.execute("PRAGMA table_info(locks)")]
+            if lock_columns and "token" not in lock_columns:
+                # Locks are short-lived, so a table from before owner tokens is just recreated
+                conn.execute("DROP TABLE locks")
+            conn.execute("CREATE TABLE IF NOT EXISTS locks (name TEXT PRIMARY KEY, token TEXT, expires_at REAL)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace, key):
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, expires_at, last_access FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at, last_access = row
+        if expires_at is not None and expires_at <= now:
+            conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+            return None
+        # A hit is a read; the LRU timestamp (a write) is refreshed at most once per touch_interval
+        if now - last_access >= self.touch_interval:
+            conn.execute(
+                "UPDATE entries SET last_access = ? WHERE namespace = ? AND key = ?", (now, namespace, key)
+            )
+        return (value,)
+
+    def set(self, namespace, key, value, ttl=None, max_entries=None):
+        conn = self._connect()
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, sqlite3.Binary(value), expires_at, now),
+            )
+            conn.execute(
+                "DELETE FROM entries WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+                (namespace, now),
+            )
+            if max_entries:
+                conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key NOT IN ("
+                    " SELECT key FROM entries WHERE namespace = ? ORDER BY last_access DESC LIMIT ?)",
+                    (namespace, namespace, max_entries),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, namespace, key):
+        self._connect().execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def clear(self, namespace=None):
+        conn = self._connect()
+        if namespace is None:
+            conn.execute("DELETE FROM entries")
+        else:
+            conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+
+    def acquire_lock(self, name, ttl):
+        conn = self._connect()
+        now = time.time()
+        token = _lock_token()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM locks WHERE name = ? AND expires_at <= ?", (name, now))
+            acquired = conn.execute(
+                "INSERT OR IGNORE INTO locks VALUES (?, ?, ?)", (name, token, now + ttl)
+            ).rowcount == 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return token if acquired else None
+
+    def release_lock(self, name, token):
+        self._connect().execute("DELETE FROM locks WHERE name = ? AND token = ?", (name, token))
+
+
+class RedisBackend:
+    """Store on a Redis-protocol server. LRU order is kept in one sorted set per namespace."""
+
+    serializes = True
+
+    def __init__(self, client, prefix="diabetes-app"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        try:
+            import redis
+        except ImportError as exc:
+            raise ImportError("CACHE_BACKEND=redis requires the 'redis' package: pip install redis") from exc
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def _key(self, namespace, key):
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def _lru_key(self, namespace):
+        return f"{self.prefix}:{namespace}:__lru__"
+
+    def get(self, namespace, key):
+        value = self.client.get(self._key(namespace, key))
+        if value is None:
+            self.client.zrem(self._lru_key(namespace), key)
+            return None
+        self.client.zadd(self._lru_key(namespace), {key: time.time()})
+        return (value,)
+
+    def set(self, namespace, key, value, ttl=None, max_entries=None):
+        self.client.set(self._key(namespace, key), value, px=int(ttl * 1000) if ttl else None)
+        lru_key = self._lru_key(namespace)
+        self.client.zadd(lru_key, {key: time.time()})
+        if max_entries:
+            overflow = self.client.zcard(lru_key) - max_entries
+            if overflow > 0:
+                stale = self.client.zrange(lru_key, 0, overflow - 1)
+                if stale:
+                    stale = [k.decode() if isinstance(k, bytes) else k for k in stale]
+                    self.client.delete(*[self._key(namespace, k) for k in stale])
+                    self.client.zrem(lru_key, *stale)
+
+    def delete(self, namespace, key):
+        self.client.delete(self._key(namespace, key))
+        self.client.zrem(self._lru_key(namespace), key)
+
+    def clear(self, namespace=None):
+        pattern = f"{self.prefix}:{namespace or '*'}:*"
+        keys = list(self.client.scan_iter(match=pattern))
+        if keys:
+            self.client.delete(*keys)
+
+    def _lock_key(self, name):
+        return f"{self.prefix}:__lock__:{name}"
+
+    def acquire_lock(self, name, ttl):
+        token = _lock_token()
+        acquired = self.client.set(self._lock_key(name), token, nx=True, px=int(ttl * 1000))
+        return token if acquired else None
+
+    def release_lock(self, name, token):
+        # Compare-and-delete in one step on the server
+        self.client.eval(RELEASE_LOCK_SCRIPT, 1, self._lock_key(name), token)
+
+
+class FakeRedis:
+    """Minimal in-process stand-in for the Redis commands ``RedisBackend`` uses."""
+
+    def __init__(self):
+        self._values = {}  # key -> (expires_at, value)
+        self._zsets = {}
+        self._mutex = threading.Lock()
+
+    def _alive(self, key):
+        item = self._values.get(key)
+        if item is None:
+            return None
+        if item[0] is not None and item[0] <= time.time():
+            del self._values[key]
+            return None
+        return item
+
+    def get(self, key):
+        with self._mutex:
+            item = self._alive(key)
+            return None if item is None else item[1]
+
+    def set(self, key, value, px=None, nx=False):
+        with self._mutex:
+            if nx and self._alive(key) is not None:
+                return None
+            expires_at = time.time() + px / 1000 if px else None
+            self._values[key] = (expires_at, value)
+            return True
+
+    def delete(self, *keys):
+        with self._mutex:
+            removed = 0
+            for key in keys:
+                removed += self._values.pop(key, None) is not None
+                removed += self._zsets.pop(key, None) is not None
+            return removed
+
+    def eval(self, script, numkeys, *args):
+        if script != RELEASE_LOCK_SCRIPT:
+            raise NotImplementedError("FakeRedis only runs RELEASE_LOCK_SCRIPT")
+        key, token = args
+        with self._mutex:
+            item = self._alive(key)
+            if item is None or item[1] not in (token, token.encode()):
+                return 0
+            del self._values[key]
+            return 1
+
+    def zadd(self, key, mapping):
+        with self._mutex:
+            self._zsets.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key, *members):
+        with self._mutex:
+            zset = self._zsets.get(key, {})
+            for member in members:
+                zset.pop(member, None)
+
+    def zcard(self, key):
+        with self._mutex:
+            return len(self._zsets.get(key, {}))
+
+    def zrange(self, key, start, end):
+        with self._mutex:
+            ordered = sorted(self._zsets.get(key, {}).items(), key=lambda item: item[1])
+            end = len(ordered) if end == -1 else end + 1
+            return [member for member, _ in ordered[start:end]]
+
+    def scan_iter(self, match="*"):
+        import fnmatch
+
+        with self._mutex:
+            keys = list(self._values) + list(self._zsets)
+        return [key for key in keys if fnmatch.fnmatch(key, match)]
+
+
+# ------------------ Cache Front-end ------------------ #
+class Cache:
+    def __init__(self, shared_backend=None, namespaces=None):
+        self.local = MemoryBackend()
+        self.shared = shared_backend
+        self.namespaces = dict(NAMESPACES if namespaces is None else namespaces)
+        self._flights = {}  # (namespace, key) -> [lock, number of threads using it]
+        self._flights_mutex = threading.Lock()
+
+    def policy(self, namespace):
+        return self.namespaces.get(namespace, DEFAULT_POLICY)
+
+    def _shared_for(self, namespace):
+        return self.shared if self.shared is not None and self.policy(namespace).shared else None
+
+    def get(self, namespace, key, default=None):
+        hit = self.local.get(namespace, key)
+        if hit is not None:
+            return hit[0]
+        shared = self._shared_for(namespace)
+        if shared is not None:
+            hit = shared.get(namespace, key)
+            if hit is not None:
+                value = pickle.loads(hit[0]) if shared.serializes else hit[0]
+                policy = self.policy(namespace)
+                self.local.set(namespace, key, value, policy.ttl, policy.max_entries)
+                return value
+        return default
+
+    def set(self, namespace, key, value):
+        policy = self.policy(namespace)
+        self.local.set(namespace, key, value, policy.ttl, policy.max_entries)
+        shared = self._shared_for(namespace)
+        if shared is not None:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL) if shared.serializes else value
+            shared.set(namespace, key, payload, policy.ttl, policy.max_entries)
+
+    def delete(self, namespace, key):
+        self.local.delete(namespace, key)
+        shared = self._shared_for(namespace)
+        if shared is not None:
+            shared.delete(namespace, key)
+
+    def clear(self, namespace=None):
+        self.local.clear(namespace)
+        if self.shared is not None:
+            self.shared.clear(namespace)
+
+    @contextmanager
+    def _single_flight(self, namespace, key):
+        """Hold the per-key lock; the entry is dropped once no thread is using it."""
+        flight_key = (namespace, key)
+        with self._flights_mutex:
+            flight = self._flights.get(flight_key)
+            if flight is None:
+                flight = self._flights[flight_key] = [threading.Lock(), 0]
+            flight[1] += 1
+        try:
+            with flight[0]:
+                yield
+        finally:
+            with self._flights_mutex:
+                flight[1] -= 1
+                if flight[1] == 0:
+                    del self._flights[flight_key]
+
+    def get_or_compute(self, namespace, key, compute):
+        """Return the cached value, computing it exactly once across concurrent callers."""
+        missing = object()
+        value = self.get(namespace, key, missing)
+        if value is not missing:
+            return value
+
+        # Threads in this process queue on one lock per key ...
+        with self._single_flight(namespace, key):
+            value = self.get(namespace, key, missing)
+            if value is not missing:
+                return value
+
+            # ... and processes sharing a backend queue on a backend lock.
+            shared = self._shared_for(namespace)
+            lock_name = f"{namespace}:{key}"
+            token = None
+            if shared is not None:
+                while (token := shared.acquire_lock(lock_name, LOCK_TTL)) is None:
+                    time.sleep(LOCK_POLL_INTERVAL)
+                    value = self.get(namespace, key, missing)
+                    if value is not missing:
+                        return value
+            try:
+                value = self.get(namespace, key, missing)
+                if value is missing:
+                    value = compute()
+                    self.set(namespace, key, value)
+                return value
+            finally:
+                if token is not None:
+                    # Only removes our own lock, not one taken over after LOCK_TTL
+                    shared.release_lock(lock_name, token)
+
+    def cached(self, namespace, key_func=None):
+        """Decorator caching a function's return value in ``namespace``."""
+        def decorator(func):
+            def wrapper(*args, **kwargs):
+                if key_func is not None:
+                    key = key_func(*args, **kwargs)
+                else:
+                    key = make_key(func.__module__, func.__qualname__, args, sorted(kwargs.items()))
+                return self.get_or_compute(namespace, key, lambda: func(*args, **kwargs))
+
+            wrapper.__name__ = func.__name__
+            wrapper.__doc__ = func.__doc__
+            wrapper.__wrapped__ = func
+            return wrapper
+
+        return decorator
+
+
+def backend_from_env():
+    kind = os.environ.get("CACHE_BACKEND", "memory").lower()
+    if kind == "memory":
+        return None
+    if kind == "sqlite":
+        return SQLiteBackend(os.environ.get("CACHE_PATH", os.path.join(".cache", "app_cache.sqlite3")))
+    if kind == "redis":
+        return RedisBackend.from_url(os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+    if kind == "fakeredis":
+        return RedisBackend(FakeRedis())
+    raise ValueError(f"Unknown CACHE_BACKEND: {kind!r} (expected memory, sqlite, redis or fakeredis)")
+
+
+_cache = None
+_cache_mutex = threading.Lock()
+
+
+def get_cache():
+    """Process-wide cache, created on first use from the environment."""
+    global _cache
+    if _cache is None:
+        with _cache_mutex:
+            if _cache is None:
+                _cache = Cache(backend_from_env())
+    return _cache
@@ -0,0 +1,58 @@
+"""Static Model Performance figures, rendered once and shared as PNG bytes.
+
+The confusion matrix and ROC curve only change when the model or the test
+split changes, so they are rendered once per artifact version into the
+evaluations cache instead of on every page run. Rendering uses
+``matplotlib.figure.Figure`` directly rather than ``pyplot``, whose global
+state is not safe to use from concurrent sessions.
+"""
+import io
+
+import seaborn as sns
+from matplotlib.figure import Figure
+from sklearn.metrics import auc, confusion_matrix, roc_curve
+
+from utils.bootstrap import _artifact_signature, test_predictions
+from utils.cache import get_cache, make_key
+
+# st.pyplot's defaults, so the images look the same as before
+DPI = 200
+
+
+def _to_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=DPI, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def render_confusion_matrix():
+    y_test, y_pred, _ = test_predictions()
+    fig = Figure()
+    ax = fig.subplots()
+    sns.heatmap(confusion_matrix(y_test, y_pred), annot=True, fmt="d", cmap="Blues", ax=ax)
+    ax.set_xlabel("Predicted")
+    ax.set_ylabel("Actual")
+    return _to_png(fig)
+
+
+def render_roc_curve():
+    y_test, _, y_prob = test_predictions()
+    fpr, tpr, _ = roc_curve(y_test, y_prob)
+    fig = Figure()
+    ax = fig.subplots()
+    ax.plot(fpr, tpr, label=f"AUC = {auc(fpr, tpr):.2f}")
+    ax.plot([0, 1], [0, 1], linestyle="--")
+    ax.set_xlabel("False Positive Rate")
+    ax.set_ylabel("True Positive Rate")
+    ax.set_title("ROC Curve")
+    ax.legend()
+    return _to_png(fig)
+
+
+FIGURES = {"confusion_matrix": render_confusion_matrix, "roc_curve": render_roc_curve}
+
+
+def performance_figure(name):
+    """PNG bytes of a static performance figure, rendered once per model/test-set version."""
+    key = make_key("figure", name, _artifact_signature())
+    return get_cache().get_or_compute("evaluations", key, FIGURES[name])
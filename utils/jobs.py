@@ -0,0 +1,494 @@
+"""Persistent background jobs for long-running scoring and evaluation.
+
+Pages call ``submit`` to put a job on a queue in SQLite and return at once;
+the job survives page reloads and server restarts. A worker claims queued
+jobs and runs each one in a separate process from a process pool, so heavy
+work never runs on a Streamlit script thread. Pages poll ``get_job`` for
+status and progress.
+
+- **Tasks** are registered with ``@task("name")`` and called as
+  ``fn(params, job)``; ``job.progress(fraction, message)`` records progress
+  and raises ``JobCancelled`` once cancellation has been requested.
+- **Cancellation**: queued jobs are cancelled immediately; running jobs stop
+  at their next progress update.
+- **Results** are pickled to ``.cache/job_results`` (tasks may write extra
+  files there with ``job.result_file``) and kept for
+  ``JOB_RESULT_TTL`` seconds (7 days by default), then purged with the job.
+- **Crashes**: running jobs send heartbeats; a job whose worker stopped
+  sending them is requeued (up to ``MAX_ATTEMPTS`` times).
+
+Workers: with ``JOB_WORKER=embedded`` (default) the Streamlit process starts
+a worker thread on first use. With ``JOB_WORKER=external`` run a dedicated
+worker instead::
+
+    python -m utils.jobs --workers 2
+
+Configuration (environment variables): ``JOBS_PATH``, ``JOB_WORKER``,
+``JOB_WORKERS``, ``JOB_RESULT_TTL``.
+"""
+import glob
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import joblib
+import numpy as np
+import pandas as pd
+
+DEFAULT_JOBS_PATH = os.path.join(".cache", "jobs.sqlite3")
+RESULTS_DIR = os.path.join(".cache", "job_results")
+INPUTS_DIR = os.path.join(".cache", "job_inputs")
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+HEARTBEAT_INTERVAL = 5.0
+STALE_AFTER = 60.0
+MAX_ATTEMPTS = 3
+POLL_INTERVAL = 1.0
+DEFAULT_RESULT_TTL = 7 * 24 * 3600
+
+class JobCancelled(Exception):
+    pass
+
+
+# ------------------ Task Registry ------------------ #
+TASKS = {}
+
+
+def task(name):
+    """Register ``fn(params, job)`` as the task run for jobs of kind ``name``."""
+    def register(fn):
+        TASKS[name] = fn
+        return fn
+    return register
+
+
+# ------------------ Store ------------------ #
+def _jobs_path():
+    return os.environ.get("JOBS_PATH", DEFAULT_JOBS_PATH)
+
+
+def _connect(path=None):
+    path = path or _jobs_path()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS jobs ("
+        " id TEXT PRIMARY KEY, kind TEXT, params TEXT, status TEXT, progress REAL, message TEXT,"
+        " result_path TEXT, error TEXT, cancel_requested INTEGER DEFAULT 0, attempts INTEGER DEFAULT 0,"
+        " created_at REAL, started_at REAL, finished_at REAL, heartbeat REAL)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+    return conn
+
+
+def _update(job_id, **fields):
+    conn = _connect()
+    try:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+    finally:
+        conn.close()
+
+
+def _as_dict(row):
+    job = dict(row)
+    job["params"] = json.loads(job["params"])
+    return job
+
+
+def submit(kind, params=None):
+    """Queue a job and return its id."""
+    if kind not in TASKS:
+        raise ValueError(f"Unknown job kind: {kind!r} (expected one of {sorted(TASKS)})")
+    job_id = uuid.uuid4().hex
+    conn = _connect()
+    try:
+        conn.execute(
+            "INSERT INTO jobs (id, kind, params, status, progress, message, created_at) VALUES (?, ?, ?, ?, 0, 'Queued', ?)",
+            (job_id, kind, json.dumps(params or {}), QUEUED, time.time()),
+        )
+    finally:
+        conn.close()
+    ensure_worker()
+    return job_id
+
+
+def get_job(job_id):
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    return _as_dict(row) if row else None
+
+
+def list_jobs(kind=None, limit=50):
+    """Most recent jobs (optionally of one kind) as a DataFrame, newest first."""
+    sql = "SELECT * FROM jobs"
+    params = []
+    if kind is not None:
+        sql += " WHERE kind = ?"
+        params.append(kind)
+    sql += " ORDER BY created_at DESC LIMIT ?"
+    params.append(int(limit))
+    conn = _connect()
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+
+def latest_job(kind):
+    jobs = list_jobs(kind, limit=1)
+    return None if jobs.empty else get_job(jobs.iloc[0]["id"])
+
+
+def cancel(job_id):
+    """Cancel a queued job now, or ask a running job to stop at its next progress update."""
+    conn = _connect()
+    try:
+        conn.execute(
+            "UPDATE jobs SET status = ?, message = 'Cancelled', finished_at = ? WHERE id = ? AND status = ?",
+            (CANCELLED, time.time(), job_id, QUEUED),
+        )
+        conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, RUNNING))
+    finally:
+        conn.close()
+
+
+def load_result(job):
+    """Unpickle a finished job's result (``job`` is a dict from ``get_job`` or a job id).
+
+    Results are written once, so each is read from disk once per process.
+    Callers must treat it as read-only.
+    """
+    from utils.artifacts import load_artifact
+
+    job = get_job(job) if isinstance(job, str) else job
+    path = job and job["result_path"]
+    if job is None or job["status"] != SUCCEEDED or not path or not os.path.exists(path):
+        return None
+    # Kept apart from the models so a page of job results cannot evict them
+    return load_artifact(path, namespace="job_results")
+
+
+def result_ttl():
+    """Seconds finished jobs and their results are kept."""
+    return float(os.environ.get("JOB_RESULT_TTL", DEFAULT_RESULT_TTL))
+
+
+def purge_expired(ttl=None):
+    """Delete finished jobs older than ``ttl`` seconds, with their result and input files."""
+    ttl = result_ttl() if ttl is None else ttl
+    cutoff = time.time() - ttl
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            f"SELECT id, params FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED))}) AND finished_at < ?",
+            (*FINISHED, cutoff),
+        ).fetchall()
+        for row in rows:
+            paths = glob.glob(os.path.join(RESULTS_DIR, f"{row['id']}.*"))
+            input_path = json.loads(row["params"]).get("input_path")
+            # Only uploads saved by ``save_input`` belong to the job; never delete other files
+            if input_path and os.path.dirname(os.path.abspath(input_path)) == os.path.abspath(INPUTS_DIR):
+                paths.append(input_path)
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+            conn.execute("DELETE FROM jobs WHERE id = ?", (row["id"],))
+    finally:
+        conn.close()
+    return len(rows)
+
+
+def save_input(data, suffix=".csv"):
+    """Persist an uploaded file so a job can read it later, possibly from another process."""
+    os.makedirs(INPUTS_DIR, exist_ok=True)
+    path = os.path.join(INPUTS_DIR, f"{uuid.uuid4().hex}{suffix}")
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+# ------------------ Running Jobs ------------------ #
+class JobContext:
+    """Handle passed to a running task for progress reporting and cancellation."""
+
+    def __init__(self, job_id):
+        self.id = job_id
+
+    def result_file(self, suffix):
+        """Path for an extra output file, retained and purged with the job."""
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        return os.path.join(RESULTS_DIR, f"{self.id}{suffix}")
+
+    def cancelled(self):
+        job = get_job(self.id)
+        return bool(job and job["cancel_requested"])
+
+    def progress(self, fraction, message=None):
+        fields = {"progress": float(min(max(fraction, 0.0), 1.0)), "heartbeat": time.time()}
+        if message is not None:
+            fields["message"] = message
+        _update(self.id, **fields)
+        if self.cancelled():
+            raise JobCancelled()
+
+
+def _heartbeat(job_id, stop):
+    while not stop.wait(HEARTBEAT_INTERVAL):
+        _update(job_id, heartbeat=time.time())
+
+
+def execute(job_id):
+    """Run one claimed job to completion; called in a worker process."""
+    job = get_job(job_id)
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(job_id, stop), daemon=True).start()
+    try:
+        context = JobContext(job_id)
+        result = TASKS[job["kind"]](job["params"], context)
+        result_path = context.result_file(".pkl")
+        joblib.dump(result, result_path)
+        _update(job_id, status=SUCCEEDED, progress=1.0, message="Done", result_path=result_path, finished_at=time.time())
+    except JobCancelled:
+        _update(job_id, status=CANCELLED, message="Cancelled", finished_at=time.time())
+    except Exception as exc:
+        _update(
+            job_id, status=FAILED, message=f"{type(exc).__name__}: {exc}",
+            error=traceback.format_exc(), finished_at=time.time(),
+        )
+    finally:
+        stop.set()
+
+
+def claim_next():
+    """Atomically mark the oldest queued job as running and return its id."""
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+        ).fetchone()
+        if row is not None:
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = ?, message = 'Starting', attempts = attempts + 1,"
+                " started_at = ?, heartbeat = ? WHERE id = ?",
+                (RUNNING, now, now, row["id"]),
+            )
+        conn.execute("COMMIT")
+        return row["id"] if row else None
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def requeue_stale():
+    """Requeue running jobs whose worker stopped sending heartbeats (or fail them after ``MAX_ATTEMPTS``)."""
+    cutoff = time.time() - STALE_AFTER
+    conn = _connect()
+    try:
+        conn.execute(
+            "UPDATE jobs SET status = ?, message = 'Worker stopped; retrying' "
+            "WHERE status = ? AND heartbeat < ? AND attempts < ?",
+            (QUEUED, RUNNING, cutoff, MAX_ATTEMPTS),
+        )
+        conn.execute(
+            "UPDATE jobs SET status = ?, message = 'Worker stopped too many times', finished_at = ? "
+            "WHERE status = ? AND heartbeat < ?",
+            (FAILED, time.time(), RUNNING, cutoff),
+        )
+    finally:
+        conn.close()
+
+
+def _fail_if_running(job_id, message):
+    conn = _connect()
+    try:
+        conn.execute(
+            "UPDATE jobs SET status = ?, message = ?, finished_at = ? WHERE id = ? AND status = ?",
+            (FAILED, message, time.time(), job_id, RUNNING),
+        )
+    finally:
+        conn.close()
+
+
+def run_worker(n_workers=2, poll_interval=POLL_INTERVAL, stop_event=None):
+    """Claim queued jobs and run each in a worker process until ``stop_event`` is set."""
+    # spawn: forking a process with running server threads is not safe
+    context = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(max_workers=n_workers, mp_context=context)
+    running = {}
+    last_maintenance = 0.0
+    try:
+        while not (stop_event is not None and stop_event.is_set()):
+            if time.time() - last_maintenance > STALE_AFTER:
+                requeue_stale()
+                purge_expired()
+                last_maintenance = time.time()
+
+            for future in [f for f in running if f.done()]:
+                job_id = running.pop(future)
+                # ``execute`` records its own failures; an exception here means the process died
+                if future.exception() is not None:
+                    _fail_if_running(job_id, f"Worker process died: {future.exception()}")
+                    if isinstance(future.exception(), BrokenProcessPool):
+                        pool.shutdown(wait=False)
+                        pool = ProcessPoolExecutor(max_workers=n_workers, mp_context=context)
+
+            job_id = claim_next() if len(running) < n_workers else None
+            if job_id is None:
+                time.sleep(poll_interval)
+                continue
+            running[pool.submit(execute, job_id)] = job_id
+    finally:
+        pool.shutdown(wait=True)
+
+
+_worker_thread = None
+_worker_mutex = threading.Lock()
+
+
+def ensure_worker():
+    """Start the embedded worker thread once per process (unless ``JOB_WORKER=external``)."""
+    global _worker_thread
+    if os.environ.get("JOB_WORKER", "embedded").lower() == "external":
+        return
+    with _worker_mutex:
+        if _worker_thread is None or not _worker_thread.is_alive():
+            n_workers = int(os.environ.get("JOB_WORKERS", "2"))
+            _worker_thread = threading.Thread(target=run_worker, args=(n_workers,), name="job-worker", daemon=True)
+            _worker_thread.start()
+
+
+# ------------------ Tasks ------------------ #
+# Rows with any of these missing or zero are rejected, as on the Diabetes Prediction page
+NONZERO_FEATURES = ["Glucose", "BloodPressure", "BMI", "Age"]
+
+
+def _rejection_reasons(features):
+    """Why each row cannot be scored (empty string for valid rows)."""
+    invalid = features[NONZERO_FEATURES].isna() | (features[NONZERO_FEATURES] == 0)
+    other_missing = features.drop(columns=NONZERO_FEATURES).isna()
+    reasons = pd.Series("", index=features.index)
+    for col in NONZERO_FEATURES:
+        reasons[invalid[col]] += f"{col} cannot be zero or missing. "
+    for col in other_missing.columns:
+        reasons[other_missing[col]] += f"{col} is missing. "
+    return reasons.str.strip()
+
+
+@task("score_batch")
+def score_batch(params, job):
+    """Score every valid row of an uploaded CSV into a result CSV with Prediction and Probability columns.
+
+    Invalid rows are kept in the output with empty predictions and the reason in ``Rejected``.
+    """
+    from utils.artifacts import load_artifact
+    from utils.cohort_cube import FEATURES
+    from utils.serving import ServedModel
+    from utils.streaming_preprocessing import BIN_CONFIG_PATH, iter_chunks, model_features
+
+    input_path = params["input_path"]
+    chunksize = params.get("chunksize", 10_000)
+    model = ServedModel(params.get("model") or os.environ.get("PRIMARY_MODEL", "model.pkl"))
+    scaler = load_artifact(os.path.join("data", "scaler.pkl"))
+    columns = load_artifact(os.path.join("data", "columns.pkl"))
+    bin_config = load_artifact(BIN_CONFIG_PATH)
+
+    with open(input_path, "rb") as f:
+        total_rows = max(sum(1 for _ in f) - 1, 1)
+    job.progress(0.0, f"Scoring {total_rows:,} rows with {model.name}")
+
+    output_path = job.result_file(".csv")
+    done = scored = positives = 0
+    for chunk in iter_chunks(input_path, chunksize):
+        missing = [col for col in FEATURES if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"Uploaded file is missing columns: {', '.join(missing)}")
+        raw = chunk[FEATURES].apply(pd.to_numeric, errors="coerce")
+        reasons = _rejection_reasons(raw)
+        valid = (reasons == "").to_numpy()
+
+        predictions = pd.Series(pd.NA, index=chunk.index, dtype="Int64")
+        probabilities = pd.Series(np.nan, index=chunk.index)
+        if valid.any():
+            features = model_features(raw[valid], bin_config, columns)
+            predictions[valid], probabilities[valid] = model.score(scaler.transform(features))
+        chunk.assign(Prediction=predictions, Probability=probabilities, Rejected=reasons).to_csv(
+            output_path, mode="w" if done == 0 else "a", header=done == 0, index=False
+        )
+        done += len(chunk)
+        scored += int(valid.sum())
+        positives += int(predictions.sum())
+        job.progress(done / total_rows, f"Scored {done:,} of {total_rows:,} rows")
+    return {
+        "output_path": output_path,
+        "rows": done,
+        "scored": scored,
+        "rejected": done - scored,
+        "predicted_diabetic": positives,
+        "model_version": model.version,
+    }
+
+
+@task("bootstrap_evaluation")
+def bootstrap_evaluation(params, job):
+    """Recompute the Model Performance confidence intervals with one visitor's settings.
+
+    The intervals are the job's result; the default file every visitor sees is left alone.
+    """
+    from utils.bootstrap import compute_results
+
+    n_resamples = int(params.get("n_resamples", 5000))
+
+    def progress(fraction):
+        job.progress(fraction, f"Resampled the test set {int(fraction * n_resamples):,} of {n_resamples:,} times")
+
+    progress(0.0)
+    return compute_results(
+        n_resamples=n_resamples,
+        confidence=float(params.get("confidence", 0.95)),
+        seed=int(params.get("seed", 42)),
+        progress=progress,
+    )
+
+
+@task("compile_candidates")
+def compile_candidates(params, job):
+    """Retrain and compile the Random Forest and SVM candidate models."""
+    from utils.compiled_models import build_compiled_candidates
+
+    return sorted(build_compiled_candidates(progress=job.progress))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run background jobs queued by the app.")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("JOB_WORKERS", "2")))
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL)
+    args = parser.parse_args()
+
+    print(f"👷 Job worker with {args.workers} processes watching: {_jobs_path()}")
+    try:
+        run_worker(args.workers, args.poll_interval)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,254 @@
+"""Concurrent-session load harness for the Streamlit app.
+
+Drives N simulated user sessions through every page with Streamlit's
+``AppTest`` (one ``AppTest`` per session, so each has its own
+``st.session_state``), running them concurrently on a thread pool. All
+sessions are kept alive until the end, as they would be on a real server,
+and the harness reports:
+
+- page latency (median / p95 across every page run),
+- per-session memory: traced Python allocations (``tracemalloc``) and
+  process RSS growth, both divided by the number of sessions,
+- per-session ``st.session_state`` size (pickled),
+- an estimate of how many concurrent sessions fit in ``--memory-limit-mb``.
+
+The sessions click "Predict", so they write audit records and could enqueue
+jobs. The harness points the audit log, job queue and cache at a temporary
+directory first (see ``isolated_stores``), so a run never touches the
+stores a live deployment reads.
+
+Run from the repository root::
+
+    python -m utils.load_test --sessions 50 --concurrency 8
+"""
+import contextlib
+import os
+import pickle
+import statistics
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+MAIN_SCRIPT = "app.py"
+PAGES = [
+    "pages/Model_Data_Exploration.py",
+    "pages/Visualizations.py",
+    "pages/Cohort_Dashboard.py",
+    "pages/Model_Prediction.py",
+    "pages/Batch_Scoring.py",
+    "pages/Model_Performance.py",
+    "pages/Prediction_Monitoring.py",
+]
+PAGE_TIMEOUT = 120
+# Stores the pages write to; sessions get throwaway ones
+STORE_VARIABLES = ("AUDIT_LOG_BACKEND", "AUDIT_LOG_PATH", "JOBS_PATH", "JOB_WORKER", "CACHE_BACKEND", "CACHE_PATH")
+
+
+def rss_bytes():
+    """Current resident set size of this process."""
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        # Peak rather than current RSS, but the best portable fallback
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if os.uname().sysname == "Darwin" else maxrss * 1024
+
+
+def _timed_run(at, latencies, page):
+    start = time.perf_counter()
+    at.run(timeout=PAGE_TIMEOUT)
+    latencies.append((page, time.perf_counter() - start))
+    if at.exception:
+        raise RuntimeError(f"{page} raised: {at.exception[0].value}")
+
+
+def _interact(at, page, latencies, session_id):
+    """A few realistic widget interactions per page."""
+    if page == "pages/Model_Data_Exploration.py":
+        shuffle = [b for b in at.button if "Shuffle" in b.label]
+        if shuffle:
+            shuffle[0].click()
+            _timed_run(at, latencies, page)
+    elif page == "pages/Visualizations.py":
+        feature = at.selectbox[0]
+        feature.select(feature.options[session_id % len(feature.options)])
+        _timed_run(at, latencies, page)
+    elif page == "pages/Model_Prediction.py":
+        example = at.selectbox[0]
+        example.select(example.options[1 + session_id % (len(example.options) - 1)])
+        _timed_run(at, latencies, page)
+        at.button[0].click()
+        _timed_run(at, latencies, page)
+
+
+@contextlib.contextmanager
+def isolated_stores():
+    """Point the audit log, job queue and cache at a temporary directory for the duration.
+
+    Must be entered before the first session runs: the app creates its
+    audit logger and cache from the environment on first use.
+    """
+    from utils import audit_log, cache
+
+    if audit_log._loggers or cache._cache is not None:
+        raise RuntimeError("The audit log or cache is already open in this process; run the load test in a fresh process")
+    saved = {name: os.environ.get(name) for name in STORE_VARIABLES}
+    with tempfile.TemporaryDirectory(prefix="load-test-") as directory:
+        os.environ.update({
+            "AUDIT_LOG_BACKEND": "sqlite",
+            "AUDIT_LOG_PATH": os.path.join(directory, "audit_log.sqlite3"),
+            "JOBS_PATH": os.path.join(directory, "jobs.sqlite3"),
+            "JOB_WORKER": "external",
+            "CACHE_BACKEND": "memory",
+            "CACHE_PATH": os.path.join(directory, "app_cache.sqlite3"),
+        })
+        try:
+            yield directory
+        finally:
+            # Flush and close the loggers before their database is deleted
+            for logger in list(audit_log._loggers.values()):
+                logger.close()
+            audit_log._loggers.clear()
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+def _share_script_cache():
+    """Make every AppTest share one compiled-script cache, as sessions do on a real server.
+
+    AppTest otherwise compiles each page in every session, and concurrent
+    compiles trip a thread-safety bug in CPython's AST module. This replaces
+    a private Streamlit name, so fail loudly if a Streamlit release moves it.
+    """
+    import streamlit
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    try:
+        from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    except ImportError:
+        ScriptCache = None
+    if ScriptCache is None or not all(hasattr(module, "ScriptCache") for module in (app_test, local_script_runner)):
+        raise RuntimeError(
+            f"Streamlit {streamlit.__version__} no longer exposes ScriptCache where the load test expects it "
+            "(checked with 1.66); update _share_script_cache for this release"
+        )
+
+    shared = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: shared
+
+
+def run_session(session_id, pages=PAGES):
+    """One user visiting every page. Returns the live AppTest, its page latencies and any error."""
+    from streamlit.testing.v1 import AppTest
+
+    latencies = []
+    # AppTest resolves relative paths against the calling file, not the working directory
+    at = AppTest.from_file(os.path.abspath(MAIN_SCRIPT), default_timeout=PAGE_TIMEOUT)
+    try:
+        _timed_run(at, latencies, MAIN_SCRIPT)
+        for page in pages:
+            at.switch_page(page)
+            _timed_run(at, latencies, page)
+            _interact(at, page, latencies, session_id)
+    except Exception as exc:
+        return at, latencies, f"{type(exc).__name__}: {exc}"
+    return at, latencies, None
+
+
+def session_state_bytes(at):
+    """Pickled size of the user-visible session state."""
+    return len(pickle.dumps(at.session_state.to_dict(), protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def run_load_test(n_sessions, concurrency, memory_limit_mb=1024, pages=PAGES):
+    _share_script_cache()
+    with isolated_stores():
+        return _run_load_test(n_sessions, concurrency, memory_limit_mb, pages)
+
+
+def _run_load_test(n_sessions, concurrency, memory_limit_mb, pages):
+
+    # Warm-up session: imports, artifact loading and caches are shared by all
+    # sessions, so they are excluded from the per-session numbers.
+    warm_at, _, error = run_session(-1, pages)
+    if error:
+        raise RuntimeError(f"Warm-up session failed: {error}")
+    del warm_at
+
+    tracemalloc.start()
+    baseline_traced, _ = tracemalloc.get_traced_memory()
+    baseline_rss = rss_bytes()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda i: run_session(i, pages), range(n_sessions)))
+    wall_time = time.perf_counter() - start
+
+    traced, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss = rss_bytes()
+
+    sessions = [at for at, _, _ in results]
+    latencies = [seconds for _, runs, _ in results for _, seconds in runs]
+    errors = [error for _, _, error in results if error]
+    state_sizes = [session_state_bytes(at) for at in sessions]
+
+    per_session_traced = (traced - baseline_traced) / n_sessions
+    per_session_rss = max(rss - baseline_rss, 0) / n_sessions
+    per_session = max(per_session_traced, per_session_rss, 1)
+    headroom = memory_limit_mb * 1024 ** 2 - baseline_rss
+    return {
+        "sessions": n_sessions,
+        "concurrency": concurrency,
+        "wall_time_s": wall_time,
+        "page_runs": len(latencies),
+        "failed_sessions": len(errors),
+        "errors": errors,
+        "latency_p50_ms": statistics.median(latencies) * 1000,
+        "latency_p95_ms": statistics.quantiles(latencies, n=20)[-1] * 1000 if len(latencies) > 1 else latencies[0] * 1000,
+        "baseline_rss_mb": baseline_rss / 1024 ** 2,
+        "per_session_traced_kb": per_session_traced / 1024,
+        "peak_traced_mb": peak_traced / 1024 ** 2,
+        "per_session_rss_kb": per_session_rss / 1024,
+        "session_state_bytes_avg": statistics.mean(state_sizes),
+        "estimated_max_sessions": int(headroom // per_session) if headroom > 0 else 0,
+        "memory_limit_mb": memory_limit_mb,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import logging
+
+    parser = argparse.ArgumentParser(description="Drive concurrent simulated sessions through every page.")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--memory-limit-mb", type=int, default=1024, help="container memory limit for the capacity estimate")
+    args = parser.parse_args()
+
+    # AppTest runs outside `streamlit run`, which makes Streamlit log noisy warnings
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    report = run_load_test(args.sessions, args.concurrency, args.memory_limit_mb)
+    print("✅ Load test complete")
+    print(f"👥 Sessions: {report['sessions']} (concurrency {report['concurrency']}), {report['page_runs']} page runs in {report['wall_time_s']:.1f}s")
+    if report["failed_sessions"]:
+        print(f"⚠️ {report['failed_sessions']} sessions failed, e.g. {report['errors'][0]}")
+    print(f"⏱️ Page latency: p50 {report['latency_p50_ms']:.0f} ms, p95 {report['latency_p95_ms']:.0f} ms")
+    print(f"🧠 Baseline RSS after warm-up: {report['baseline_rss_mb']:.1f} MB")
+    print(f"🧠 Per session: {report['per_session_traced_kb']:.1f} KB traced, {report['per_session_rss_kb']:.1f} KB RSS, "
+          f"{report['session_state_bytes_avg']:.0f} B session state")
+    print(f"📦 Estimated concurrent sessions within {report['memory_limit_mb']} MB: {report['estimated_max_sessions']:,}")
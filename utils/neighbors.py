@@ -0,0 +1,119 @@
+"""Similar-patients lookup on the training set.
+
+A KD-tree (or ball tree) is built once over ``data/X_train_scaled.csv`` -- the
+training records in the model's scaled feature space -- and saved to
+``data/neighbors_index.pkl`` together with each record's outcome and
+original (unscaled) values. Queries are O(log n) per patient instead of a
+scan over every record, and accept a whole batch at once.
+
+Run ``python -m utils.neighbors`` to rebuild the index.
+"""
+import hashlib
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree, KDTree
+
+from utils.artifacts import load_artifact
+
+SCALED_TRAIN_PATH = os.path.join("data", "X_train_scaled.csv")
+RAW_TRAIN_PATH = os.path.join("data", "X_train.pkl")
+INDEX_PATH = os.path.join("data", "neighbors_index.pkl")
+
+DISPLAY_COLUMNS = [
+    "Pregnancies", "Glucose", "BloodPressure", "SkinThickness",
+    "Insulin", "BMI", "DiabetesPedigreeFunction", "Age",
+]
+
+TREES = {"kd_tree": KDTree, "ball_tree": BallTree}
+
+
+def _source_signature():
+    digest = hashlib.sha256()
+    for path in (SCALED_TRAIN_PATH, RAW_TRAIN_PATH):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def build_index(kind="kd_tree", leaf_size=40, path=INDEX_PATH):
+    """Build the tree over the scaled training features and save it to ``path``."""
+    scaled = pd.read_csv(SCALED_TRAIN_PATH)
+    raw = pd.read_pickle(RAW_TRAIN_PATH).reset_index(drop=True)
+
+    feature_columns = [col for col in scaled.columns if col != "Outcome"]
+    features = np.ascontiguousarray(scaled[feature_columns].to_numpy(dtype=np.float64))
+    records = raw[DISPLAY_COLUMNS].copy()
+    records["Outcome"] = scaled["Outcome"].to_numpy()
+
+    index = {
+        "signature": _source_signature(),
+        "kind": kind,
+        "feature_columns": feature_columns,
+        "tree": TREES[kind](features, leaf_size=leaf_size),
+        "outcomes": records["Outcome"].to_numpy(dtype=np.int8),
+        "records": records,
+    }
+    joblib.dump(index, path)
+    return index
+
+
+def load_index(path=INDEX_PATH):
+    """Load the saved index, rebuilding it if missing, stale or unreadable."""
+    if os.path.exists(path):
+        try:
+            index = load_artifact(path)
+            if index.get("signature") == _source_signature():
+                return index
+        except Exception:
+            pass  # e.g. pickled with an incompatible scikit-learn version
+    build_index(path=path)
+    return load_artifact(path)
+
+
+def query(X_scaled, k=10, index=None):
+    """Distances, row indices and outcomes of the ``k`` nearest training records.
+
+    ``X_scaled`` is a single row or a (n, n_features) batch in the model's
+    scaled feature space; every returned array has shape (n, k).
+    """
+    index = index or load_index()
+    X_scaled = np.atleast_2d(np.asarray(X_scaled, dtype=np.float64))
+    k = min(k, len(index["outcomes"]))
+    distances, indices = index["tree"].query(X_scaled, k=k)
+    return distances, indices, index["outcomes"][indices]
+
+
+def diabetes_rate(X_scaled, k=10, index=None):
+    """Share of diabetic patients among each query row's ``k`` nearest neighbours."""
+    _, _, outcomes = query(X_scaled, k=k, index=index)
+    return outcomes.mean(axis=1)
+
+
+def similar_patients(x_scaled, k=10, index=None):
+    """The ``k`` training records closest to one patient, nearest first."""
+    index = index or load_index()
+    distances, indices, _ = query(x_scaled, k=k, index=index)
+    records = index["records"].iloc[indices[0]].copy()
+    records.insert(0, "Distance", distances[0])
+    return records.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build the similar-patients index.")
+    parser.add_argument("--kind", choices=sorted(TREES), default="kd_tree")
+    parser.add_argument("--leaf-size", type=int, default=40)
+    args = parser.parse_args()
+
+    index = build_index(kind=args.kind, leaf_size=args.leaf_size)
+    features = pd.read_csv(SCALED_TRAIN_PATH)[index["feature_columns"]].to_numpy()
+    start = time.perf_counter()
+    query(features, k=10, index=index)
+    per_query_us = (time.perf_counter() - start) / len(features) * 1e6
+    print(f"✅ {args.kind} index over {len(features)} records saved to: {INDEX_PATH}")
+    print(f"⏱️ Batched query time: {per_query_us:.1f} µs per patient")
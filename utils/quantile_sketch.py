@@ -0,0 +1,154 @@
+"""Mergeable streaming quantile sketch (KLL).
+
+``QuantileSketch`` summarises a stream of numbers in a bounded amount of
+memory and answers approximate quantile queries. Sketches built on separate
+chunks (or in separate processes) can be merged, and the merged sketch is as
+accurate as one built on the whole stream.
+
+Items live in a stack of compactors; an item at level ``h`` stands for
+``2**h`` original values. When a level overflows, it is sorted and every other
+item is promoted to the next level. While fewer than roughly ``3 * k`` values
+have been seen nothing is compacted and quantiles are exact.
+"""
+import math
+
+import numpy as np
+
+DEFAULT_K = 1000
+
+
+class QuantileSketch:
+    def __init__(self, k=DEFAULT_K, seed=None):
+        self.k = k
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    # ------------------ Updates ------------------ #
+    def update(self, values):
+        """Add an array (or scalar) of values, ignoring NaNs."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.count += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+        return self
+
+    def update_weighted(self, value, weight):
+        """Add ``weight`` copies of ``value`` without materialising them."""
+        weight = int(weight)
+        if weight <= 0:
+            return self
+        self.count += weight
+        self.min = min(self.min, float(value))
+        self.max = max(self.max, float(value))
+        # Spread the weight over levels by its binary digits, but never above the
+        # height the sketch would naturally reach for this many values (growing
+        # the stack would shrink every lower level's capacity).
+        top = max(len(self._levels) - 1, int(math.log2(max(self.count / self.k, 1))))
+        self._ensure_level(top)
+        for level in range(top):
+            if weight >> level & 1:
+                self._levels[level] = np.append(self._levels[level], value)
+        copies = weight >> top
+        if copies:
+            self._levels[top] = np.concatenate([self._levels[top], np.full(copies, float(value))])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold ``other`` into this sketch (in place) and return it."""
+        if other.count == 0:
+            return self
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._ensure_level(len(other._levels) - 1)
+        for level, items in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self._compress()
+        return self
+
+    def copy(self):
+        clone = QuantileSketch(self.k)
+        clone.count, clone.min, clone.max = self.count, self.min, self.max
+        clone._levels = [items.copy() for items in self._levels]
+        return clone
+
+    @classmethod
+    def merge_all(cls, sketches, k=DEFAULT_K):
+        merged = cls(k)
+        for sketch in sketches:
+            merged.merge(sketch)
+        return merged
+
+    # ------------------ Compaction ------------------ #
+    def _ensure_level(self, level):
+        while len(self._levels) <= level:
+            self._levels.append(np.empty(0))
+
+    def _capacity(self, level):
+        depth = len(self._levels) - level - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _size(self):
+        return sum(len(items) for items in self._levels)
+
+    def _max_size(self):
+        return sum(self._capacity(level) for level in range(len(self._levels)))
+
+    def _compress(self):
+        while self._size() > self._max_size():
+            for level, items in enumerate(self._levels):
+                if len(items) < self._capacity(level):
+                    continue
+                items = np.sort(items)
+                # An odd item stays behind so weights are preserved exactly
+                keep = items[:1] if len(items) % 2 else items[:0]
+                pairs = items[len(keep):]
+                promoted = pairs[self._rng.integers(0, 2)::2]
+                self._ensure_level(level + 1)
+                self._levels[level] = keep
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+                break
+
+    # ------------------ Queries ------------------ #
+    def _weighted_items(self):
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level) for level, items in enumerate(self._levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def _value_at_rank(self, values, cumulative, rank):
+        return values[np.searchsorted(cumulative, rank, side="right")]
+
+    def quantile(self, q):
+        """Quantile(s) with the same linear interpolation as ``pandas.Series.quantile``."""
+        if self.count == 0:
+            return np.nan if np.isscalar(q) else np.full(np.shape(q), np.nan)
+        values, cumulative = self._weighted_items()
+        qs = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        ranks = qs * (self.count - 1)
+        lower_rank = np.floor(ranks)
+        lower = self._value_at_rank(values, cumulative, lower_rank)
+        upper = self._value_at_rank(values, cumulative, np.minimum(lower_rank + 1, self.count - 1))
+        result = lower + (ranks - lower_rank) * (upper - lower)
+        result = np.clip(result, self.min, self.max)
+        return float(result[0]) if np.isscalar(q) else result
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def cdf(self, x):
+        """Approximate fraction of values <= ``x``."""
+        if self.count == 0:
+            return np.nan
+        values, cumulative = self._weighted_items()
+        idx = np.searchsorted(values, x, side="right")
+        return float(cumulative[idx - 1] / self.count) if idx else 0.0
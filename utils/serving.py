@@ -0,0 +1,217 @@
+"""Multi-model serving: a primary model, shadow models and an optional canary.
+
+For every request the ``ModelRouter`` picks the model that answers -- the
+primary, or the canary for a ``CANARY_FRACTION`` share of requests -- and the
+page scores the request with it as before. Every *other* configured model
+then scores the same feature matrix on a background thread pool, after the
+answer is known, and each comparison (both predictions and probabilities,
+both latencies) is written to the ``shadow_scores`` table of the audit log.
+The response path only pays for handing the job to the pool.
+
+Routing is sticky: a request key is hashed to a number in [0, 1), so the
+same inputs always go to the same model and the prediction cache stays
+consistent.
+
+Models are named by a path to a pickled estimator (``model.pkl``) or by a
+compiled candidate name from ``utils.compiled_models`` (``Random Forest``,
+``SVM``). All of them take the scaled feature matrix.
+
+Configuration (environment variables):
+
+- ``PRIMARY_MODEL``: default ``model.pkl``.
+- ``SHADOW_MODELS``: comma-separated models scored in the background.
+- ``CANARY_MODEL`` and ``CANARY_FRACTION`` (0-1): model answering that share
+  of requests; the primary is then scored in its shadow.
+- ``SHADOW_WORKERS``: size of the shadow thread pool (default 2).
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.artifacts import load_artifact
+from utils.audit_log import ShadowRecord, get_audit_logger, model_version
+from utils.compiled_models import COMPILED_PATHS, load_compiled
+
+# Server log, not the audit log
+log = logging.getLogger(__name__)
+
+SHADOW_TABLE = "shadow_scores"
+
+
+# ------------------ Models ------------------ #
+class ServedModel:
+    """A named model that loads on first use and scores scaled feature matrices."""
+
+    def __init__(self, name):
+        self.name = name
+        self._mutex = threading.Lock()
+
+    @property
+    def path(self):
+        return COMPILED_PATHS.get(self.name, self.name)
+
+    @property
+    def model(self):
+        # Looked up in the artifact cache every time, so a replaced file is served
+        # under its new version instead of the copy loaded at startup
+        if self.name not in COMPILED_PATHS:
+            return load_artifact(self.name)
+        with self._mutex:
+            return load_compiled(self.name)
+
+    def load(self):
+        self.model
+        return self
+
+    @property
+    def version(self):
+        # Compiled candidates are built on first load, so load before hashing
+        self.load()
+        return model_version(self.path)
+
+    def score(self, X):
+        """Predicted labels and positive-class probabilities for every row of ``X``."""
+        model = self.model
+        return model.predict(X), model.predict_proba(X)[:, 1]
+
+
+# ------------------ Shadow Scoring ------------------ #
+class ShadowScorer:
+    """Scores requests with shadow models on a thread pool and logs the comparison.
+
+    At most ``max_pending`` jobs are queued; beyond that, jobs are skipped and
+    counted in ``skipped`` rather than letting the backlog grow.
+    """
+
+    def __init__(self, max_workers=2, max_pending=1000, logger=None):
+        self.max_pending = max_pending
+        self.logger = logger or get_audit_logger(SHADOW_TABLE)
+        self.skipped = 0
+        self.failed = 0
+        self._pending = 0
+        self._mutex = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shadow-scorer")
+
+    def submit(self, X, served, served_prediction, served_probability, served_latency_ms, shadows):
+        """Queue ``X`` for every shadow model. Returns immediately."""
+        if not shadows:
+            return False
+        with self._mutex:
+            if self._pending >= self.max_pending:
+                self.skipped += 1
+                return False
+            self._pending += 1
+        future = self._pool.submit(
+            self._score, np.array(X, copy=True), served, served_prediction, served_probability, served_latency_ms, shadows
+        )
+        future.add_done_callback(self._done)
+        return True
+
+    def _done(self, future):
+        error = future.exception()
+        if error is not None:
+            log.warning("Shadow scoring failed: %s", error)
+        # Last, so ``wait`` returns only once the job is fully accounted for
+        with self._mutex:
+            self._pending -= 1
+            if error is not None:
+                self.failed += 1
+
+    def _score(self, X, served, served_prediction, served_probability, served_latency_ms, shadows):
+        served_version = served.version
+        for shadow in shadows:
+            started = time.perf_counter()
+            predictions, probabilities = shadow.score(X)
+            latency_ms = (time.perf_counter() - started) * 1000 / len(X)
+            for row, (prediction, probability) in enumerate(zip(predictions, probabilities)):
+                self.logger.log(ShadowRecord(
+                    served_version=served_version,
+                    shadow_version=shadow.version,
+                    served_prediction=int(np.ravel(served_prediction)[row]),
+                    served_probability=float(np.ravel(served_probability)[row]),
+                    shadow_prediction=int(prediction),
+                    shadow_probability=float(probability),
+                    served_latency_ms=served_latency_ms,
+                    shadow_latency_ms=latency_ms,
+                ))
+
+    def wait(self, timeout=None):
+        """Block until every queued job has finished (for tests and scripts)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._pending and (deadline is None or time.monotonic() < deadline):
+            time.sleep(0.01)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+# ------------------ Routing ------------------ #
+def _route_fraction(key):
+    """Stable number in [0, 1) for a request key."""
+    return int(hashlib.sha256(str(key).encode()).hexdigest()[:8], 16) / 16 ** 8
+
+
+class ModelRouter:
+    def __init__(self, primary, shadows=(), canary=None, canary_fraction=0.0, scorer=None):
+        if not 0.0 <= canary_fraction <= 1.0:
+            raise ValueError(f"canary_fraction must be between 0 and 1, got {canary_fraction}")
+        self.primary = ServedModel(primary)
+        self.canary = ServedModel(canary) if canary else None
+        self.canary_fraction = canary_fraction if canary else 0.0
+        names = [name for name in shadows if name not in (primary, canary)]
+        self.shadows = [ServedModel(name) for name in dict.fromkeys(names)]
+        self._scorer = scorer
+
+    @property
+    def scorer(self):
+        if self._scorer is None:
+            self._scorer = ShadowScorer()
+        return self._scorer
+
+    def route(self, key):
+        """The model that answers the request identified by ``key``."""
+        if self.canary is not None and _route_fraction(key) < self.canary_fraction:
+            return self.canary
+        return self.primary
+
+    def shadows_for(self, served):
+        """Every configured model except the one that answered."""
+        models = [self.primary] + ([self.canary] if self.canary else []) + self.shadows
+        return [model for model in models if model is not served]
+
+    def shadow(self, X, served, prediction, probability, latency_ms):
+        """Score ``X`` with every other model in the background."""
+        return self.scorer.submit(X, served, prediction, probability, latency_ms, self.shadows_for(served))
+
+
+def _split_names(value):
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def router_from_env():
+    return ModelRouter(
+        primary=os.environ.get("PRIMARY_MODEL", "model.pkl"),
+        shadows=_split_names(os.environ.get("SHADOW_MODELS", "")),
+        canary=os.environ.get("CANARY_MODEL") or None,
+        canary_fraction=float(os.environ.get("CANARY_FRACTION", "0")),
+        scorer=ShadowScorer(max_workers=int(os.environ.get("SHADOW_WORKERS", "2"))),
+    )
+
+
+_router = None
+_router_mutex = threading.Lock()
+
+
+def get_router():
+    """Process-wide router, configured from the environment on first use."""
+    global _router
+    if _router is None:
+        with _router_mutex:
+            if _router is None:
+                _router = router_from_env()
+    return _router
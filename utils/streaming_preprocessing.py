@@ -0,0 +1,219 @@
+"""Out-of-core version of the notebook's preprocessing pipeline.
+
+The notebook loads the whole dataset, replaces invalid zeros with each
+column's median, drops IQR outliers one column after another and then bins
+Age/BMI. This module does the same over a CSV or Parquet file of any size in
+two chunked passes:
+
+1. **Statistics.** Each chunk is summarised with mergeable quantile sketches
+   (one per feature, plus a zero count for the zero-replacement columns).
+   Chunks can be summarised in parallel worker processes and the sketches are
+   merged afterwards. Medians and quartiles are read off the merged sketches.
+2. **Transform.** Each chunk gets zero replacement, *all* IQR filters as one
+   combined mask, and Age/BMI binning with one-hot encoding, and is appended
+   to the cleaned and binned output files.
+
+Unlike the notebook, the quartiles of every column come from the full
+zero-replaced data rather than from the rows left over after the previous
+column's filter, which is what makes a single combined mask possible.
+
+Run ``python -m utils.streaming_preprocessing data/diabetes.csv --output-dir out``.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.quantile_sketch import DEFAULT_K, QuantileSketch
+
+ZERO_REPLACE_COLUMNS = ["Glucose", "BloodPressure", "SkinThickness", "Insulin", "BMI"]
+TARGET_COLUMN = "Outcome"
+BIN_CONFIG_PATH = os.path.join("data", "bin_config.pkl")
+DEFAULT_CHUNKSIZE = 100_000
+
+
+# ------------------ Reading ------------------ #
+def iter_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield DataFrame chunks from a CSV or Parquet file."""
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Reading Parquet input requires the 'pyarrow' package: pip install pyarrow") from exc
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+# ------------------ Pass 1: Statistics ------------------ #
+def summarize_chunk(chunk, k=DEFAULT_K):
+    """Sketches for one chunk: value sketches per feature, zero counts for the zero-replace columns."""
+    summary = {"rows": len(chunk), "zeros": {}, "sketches": {}}
+    for col in chunk.columns:
+        if col == TARGET_COLUMN:
+            continue
+        values = chunk[col].to_numpy(dtype=np.float64)
+        if col in ZERO_REPLACE_COLUMNS:
+            is_zero = values == 0
+            summary["zeros"][col] = int(is_zero.sum())
+            values = values[~is_zero]
+        summary["sketches"][col] = QuantileSketch(k).update(values)
+    return summary
+
+
+def merge_summaries(summaries, k=DEFAULT_K):
+    merged = {"rows": 0, "zeros": {}, "sketches": {}}
+    for summary in summaries:
+        merged["rows"] += summary["rows"]
+        for col, zeros in summary["zeros"].items():
+            merged["zeros"][col] = merged["zeros"].get(col, 0) + zeros
+        for col, sketch in summary["sketches"].items():
+            merged["sketches"].setdefault(col, QuantileSketch(k)).merge(sketch)
+    return merged
+
+
+def collect_statistics(path, chunksize=DEFAULT_CHUNKSIZE, n_jobs=1, k=DEFAULT_K):
+    """First pass: medians for zero replacement and IQR bounds for every feature."""
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            # Keep at most 2 chunks per worker in flight so memory stays bounded
+            pending, summaries = [], []
+            for chunk in iter_chunks(path, chunksize):
+                pending.append(pool.submit(summarize_chunk, chunk, k))
+                if len(pending) >= 2 * n_jobs:
+                    summaries.append(pending.pop(0).result())
+            summaries.extend(f.result() for f in pending)
+    else:
+        summaries = (summarize_chunk(chunk, k) for chunk in iter_chunks(path, chunksize))
+    merged = merge_summaries(summaries, k)
+
+    medians, bounds = {}, {}
+    for col, nonzero in merged["sketches"].items():
+        if col in ZERO_REPLACE_COLUMNS:
+            zeros = merged["zeros"][col]
+            # Median of the raw column, zeros included (as df[col].median() in the notebook)
+            raw = nonzero.copy().update_weighted(0.0, zeros)
+            medians[col] = raw.median()
+            # The zero-replaced column is the non-zero values plus `zeros` copies of the median
+            sketch = nonzero.copy().update_weighted(medians[col], zeros)
+        else:
+            sketch = nonzero
+        q1, q3 = sketch.quantile([0.25, 0.75])
+        iqr = q3 - q1
+        bounds[col] = (q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+    return {"rows": merged["rows"], "medians": medians, "bounds": bounds}
+
+
+# ------------------ Pass 2: Transform ------------------ #
+def replace_zeros(chunk, medians):
+    # Always float, as in the notebook: a chunk without zeros would otherwise stay int64
+    # and no longer match the schema of the chunks written before it
+    chunk = chunk.copy()
+    for col, median in medians.items():
+        chunk[col] = chunk[col].astype(np.float64).replace(0, median)
+    return chunk
+
+
+def iqr_mask(chunk, bounds):
+    """One boolean mask for all IQR filters."""
+    mask = np.ones(len(chunk), dtype=bool)
+    for col, (lower, upper) in bounds.items():
+        values = chunk[col].to_numpy()
+        mask &= (values >= lower) & (values <= upper)
+    return mask
+
+
+def bin_features(chunk, bin_config):
+    """Age/BMI groups one-hot encoded with a fixed column set, as in the notebook."""
+    binned = chunk.copy()
+    binned["AgeGroup"] = pd.Categorical(
+        pd.cut(binned["Age"], bins=bin_config["age_bins"], labels=bin_config["age_labels"], right=False),
+        categories=bin_config["age_labels"],
+    )
+    binned["BMIGroup"] = pd.Categorical(
+        pd.cut(binned["BMI"], bins=bin_config["bmi_bins"], labels=bin_config["bmi_labels"], right=False),
+        categories=bin_config["bmi_labels"],
+    )
+    return pd.get_dummies(binned, columns=["AgeGroup", "BMIGroup"])
+
+
+def model_features(raw, bin_config, columns):
+    """Raw patient rows to model inputs: Age/BMI groups as in training, in the scaler's column order.
+
+    Shared by the prediction page and batch scoring so both encode a patient
+    the same way. Values above the last bin edge (age 100+) fall in the last
+    group instead of in none.
+    """
+    open_ended = {
+        **bin_config,
+        "age_bins": [*bin_config["age_bins"][:-1], np.inf],
+        "bmi_bins": [*bin_config["bmi_bins"][:-1], np.inf],
+    }
+    features = bin_features(raw, open_ended).reindex(columns=[col for col in columns if col != TARGET_COLUMN], fill_value=0)
+    return features.astype({col: int for col in features.columns if features[col].dtype == bool})
+
+
+def _append(frame, path, first, parquet_writers):
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if first:
+            parquet_writers[path] = pq.ParquetWriter(path, table.schema)
+        parquet_writers[path].write_table(table)
+    else:
+        frame.to_csv(path, mode="w" if first else "a", header=first, index=False)
+
+
+def transform(path, stats, cleaned_path, binned_path, bin_config, chunksize=DEFAULT_CHUNKSIZE):
+    """Second pass: write the cleaned and binned datasets chunk by chunk."""
+    rows_out = 0
+    first = True
+    parquet_writers = {}
+    try:
+        for chunk in iter_chunks(path, chunksize):
+            chunk = replace_zeros(chunk, stats["medians"])
+            cleaned = chunk[iqr_mask(chunk, stats["bounds"])]
+            _append(cleaned, cleaned_path, first, parquet_writers)
+            _append(bin_features(cleaned, bin_config), binned_path, first, parquet_writers)
+            rows_out += len(cleaned)
+            first = False
+    finally:
+        for writer in parquet_writers.values():
+            writer.close()
+    return rows_out
+
+
+def run(path, output_dir, chunksize=DEFAULT_CHUNKSIZE, n_jobs=1, fmt="csv", k=DEFAULT_K):
+    """Run both passes and return the statistics used."""
+    os.makedirs(output_dir, exist_ok=True)
+    bin_config = joblib.load(BIN_CONFIG_PATH)
+    stats = collect_statistics(path, chunksize=chunksize, n_jobs=n_jobs, k=k)
+    cleaned_path = os.path.join(output_dir, f"diabetes_iqr_cleaned.{fmt}")
+    binned_path = os.path.join(output_dir, f"diabetes_binned.{fmt}")
+    stats["rows_out"] = transform(path, stats, cleaned_path, binned_path, bin_config, chunksize=chunksize)
+    stats["outputs"] = [cleaned_path, binned_path]
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stream a diabetes dataset through the preprocessing pipeline.")
+    parser.add_argument("input", help="CSV or Parquet file with the raw diabetes columns")
+    parser.add_argument("--output-dir", default=os.path.join("data", "streamed"))
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes for the statistics pass")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--sketch-size", type=int, default=DEFAULT_K)
+    args = parser.parse_args()
+
+    stats = run(args.input, args.output_dir, args.chunksize, args.jobs, args.format, args.sketch_size)
+    print(f"✅ Processed {stats['rows']:,} rows, kept {stats['rows_out']:,} after IQR filtering.")
+    print("🔢 Medians used for zero replacement:", {c: round(m, 3) for c, m in stats["medians"].items()})
+    for output in stats["outputs"]:
+        print(f"📁 Saved to: {output}")
@@ -0,0 +1,194 @@
+"""Warm-up and readiness for the app server.
+
+Right after a restart the first user would pay for importing scikit-learn,
+plotly and seaborn, unpickling models, parsing CSVs, building the search
+indexes and the first matplotlib render. ``warm_up`` does all of that before
+the server accepts traffic:
+
+1. loads every model artifact and dataset into the shared caches,
+2. scores a dummy batch with every served model (primary, canary, shadows),
+3. renders the static Model Performance figures,
+4. runs every page once, which imports everything the pages import.
+
+It then writes a readiness marker in the temp directory. The marker is
+local to the container (``.cache`` may be a volume shared by several
+replicas) and records the warming process. Because
+``--serve`` starts the Streamlit server in the same process afterwards, the
+in-process caches are already warm when the first request arrives.
+
+Usage::
+
+    python -m utils.warmup --serve    # warm up, then serve
+    python -m utils.warmup            # warm up only
+    python -m utils.warmup --check    # readiness probe (exit code)
+
+Arguments not recognised here (and ``STREAMLIT_*`` environment variables)
+are passed on to ``streamlit run``. Because warm-up has already read the
+configuration, Streamlit logs a notice that the [server] options changed
+when the server starts; the options still take effect.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+
+MAIN_SCRIPT = "app.py"
+# Per container: never on a volume other replicas can see
+READY_PATH = os.path.join(tempfile.gettempdir(), "diabetes-app-ready.json")
+DEFAULT_PORT = int(os.environ.get("STREAMLIT_SERVER_PORT", 8501))
+
+
+# ------------------ Steps ------------------ #
+def preload_artifacts():
+    from utils.artifacts import load_artifact, read_csv, read_pickle
+    from utils.bootstrap import load_bootstrap_results, test_predictions
+    from utils.cohort_cube import load_cube
+    from utils.neighbors import load_index
+
+    for path in ("model.pkl", "data/scaler.pkl", "data/columns.pkl", "data/bin_config.pkl"):
+        load_artifact(path)
+    for path in ("data/X_test.pkl", "data/y_test.pkl"):
+        read_pickle(path)
+    read_csv(os.path.join("data", "diabetes.csv"))
+    load_index()
+    load_cube()
+    test_predictions()
+    load_bootstrap_results()
+
+
+def warm_inference(batch_size=32):
+    """Score a dummy batch with every served model, plus the neighbour search."""
+    from utils.artifacts import load_artifact, read_pickle
+    from utils.neighbors import query
+    from utils.serving import get_router
+
+    scaler = load_artifact("data/scaler.pkl")
+    columns = [col for col in load_artifact("data/columns.pkl") if col != "Outcome"]
+    batch = read_pickle("data/X_test.pkl")[columns].head(batch_size)
+    X = scaler.transform(batch)
+
+    router = get_router()
+    models = [router.primary] + ([router.canary] if router.canary else []) + router.shadows
+    for model in models:
+        model.score(X)
+        model.score(X[:1])
+    query(X, k=10)
+    return [model.name for model in models]
+
+
+def prerender_figures():
+    from utils.figures import FIGURES, performance_figure
+
+    for name in FIGURES:
+        performance_figure(name)
+
+
+def render_pages():
+    """Run every page once (no widget interaction), failing on the first page that raises."""
+    from streamlit import config
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+
+    from utils.load_test import PAGE_TIMEOUT, PAGES
+
+    # AppTest runs outside `streamlit run`, which makes Streamlit log noisy warnings
+    set_log_level("error")
+    try:
+        at = AppTest.from_file(os.path.abspath(MAIN_SCRIPT), default_timeout=PAGE_TIMEOUT).run()
+        for page in PAGES:
+            at.switch_page(page).run()
+            if at.exception:
+                raise RuntimeError(f"{page} raised: {at.exception[0].value}")
+    finally:
+        set_log_level(config.get_option("logger.level"))
+    return len(PAGES)
+
+
+STEPS = [
+    ("Preloading artifacts and datasets", preload_artifacts),
+    ("Warming the inference path", warm_inference),
+    ("Prerendering performance figures", prerender_figures),
+    ("Rendering every page once", render_pages),
+]
+
+
+def warm_up(render=True, ready_path=READY_PATH):
+    """Run every warm-up step and write the readiness marker. Returns step timings in seconds."""
+    if os.path.exists(ready_path):
+        os.remove(ready_path)
+
+    timings = {}
+    for label, step in STEPS:
+        if step is render_pages and not render:
+            continue
+        started = time.perf_counter()
+        step()
+        timings[label] = time.perf_counter() - started
+        print(f"🔥 {label}: {timings[label]:.2f}s", flush=True)
+
+    directory = os.path.dirname(ready_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(ready_path, "w") as f:
+        json.dump({"pid": os.getpid(), "warmed_at": time.time(), "timings": timings}, f)
+    return timings
+
+
+# ------------------ Readiness ------------------ #
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # exists, owned by another user
+    return True
+
+
+def is_ready(port=DEFAULT_PORT, ready_path=READY_PATH, timeout=3):
+    """Warm-up finished in a process that is still running, and the server answers its health endpoint."""
+    try:
+        with open(ready_path) as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
+        return False
+    pid = marker.get("pid")
+    if not isinstance(pid, int) or pid <= 0 or not _process_alive(pid):
+        return False
+    try:
+        with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=timeout) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+def serve(streamlit_args):
+    """Start the Streamlit server in this process, as ``streamlit run app.py``."""
+    from streamlit.web import cli as stcli
+
+    sys.argv = ["streamlit", "run", MAIN_SCRIPT, *streamlit_args]
+    sys.exit(stcli.main())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Warm up the app before serving traffic.", allow_abbrev=False)
+    parser.add_argument("--serve", action="store_true", help="start the Streamlit server after warming up")
+    parser.add_argument("--check", action="store_true", help="exit 0 if the server is warmed up and healthy")
+    parser.add_argument("--skip-pages", action="store_true", help="do not render every page during warm-up")
+    parser.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help="server port for --check (default: $STREAMLIT_SERVER_PORT or 8501)"
+    )
+    args, streamlit_args = parser.parse_known_args()
+
+    if args.check:
+        sys.exit(0 if is_ready(port=args.port) else 1)
+
+    started = time.perf_counter()
+    warm_up(render=not args.skip_pages)
+    print(f"✅ Warm-up finished in {time.perf_counter() - started:.1f}s; readiness marker: {READY_PATH}", flush=True)
+    if args.serve:
+        serve(streamlit_args)